@@ -1,11 +1,9 @@
 import streamlit as st
-import pandas as pd
-import gdown
 import time
 
-from main.company_hr_info import company_hr_info
-from main.about_company import about_company
-from main.my_status import my_status
+from main.storage import getDataset
+from main.drive_sync import getSyncWorker, showSyncStatus
+from main.metrics import metrics, showMetricsPanel
 
 if 'valid' not in st.session_state:
   st.session_state.valid = False
@@ -24,45 +22,53 @@ A personalized app designed to help job seekers manage their HR contacts, compan
     follow-up reminders.
 '''
 
-@st.cache_resource
 def connectingServer():
-  gdown.download(f"https://drive.google.com/uc?id={st.secrets['JOB_DATA']}", f'job_data.csv', quiet=False)
-  data = pd.read_csv("job_data.csv")
-  return data
+  with metrics.span('connect'):
+    return getDataset().get()
 
-def startApp(data):
+def startApp(dataset):
   st.sidebar.title("Job Hunter Pro")
   options = ["Company/HR Contact Information", "Company Information", "My Status"]
   choice = st.sidebar.selectbox("Select an option", options)
+  metrics.annotate(page=choice)
+  # Pages are imported on first use so the login screen and other pages don't pay for their SDKs.
   if choice == "Company/HR Contact Information":
-    company_hr_info(data)
+    from main.company_hr_info import company_hr_info
+    company_hr_info(dataset)
   elif choice == "Company Information":
-    about_company(data)
+    from main.about_company import about_company
+    about_company(dataset)
   elif choice == "My Status":
     if st.session_state.entered_key == st.secrets['SECRET_KEY']:
-      my_status(data)
+      from main.my_status import my_status
+      my_status(dataset)
     else:
       st.header("You have not access for this area.")
       st.write("### Contact Admin for Secret Key")
       st.toast("You don't have the access for this area.", icon="🚨")
+  showSyncStatus(getSyncWorker())
+  if st.session_state.entered_key == st.secrets['SECRET_KEY']:
+    showMetricsPanel()
 
 if __name__ == '__main__':
-  data = connectingServer()
+  with metrics.rerun():
+    # The dataset (and the Drive SDKs behind it) is only needed once someone has logged in.
+    if st.session_state.valid:
+      startApp(connectingServer())
 
-  if st.session_state.valid:
-    startApp(data)
-
-  else:
-    st.title("Job Hunter Pro Application")
-    st.write(aboutApp)
-    key = st.number_input('Enter a valid password', min_value=1000, max_value=9999, step=1, placeholder=1000)
-    if st.button('Start App'):
-      st.session_state.entered_key = key
-      if key in st.secrets['PASSWORDS']:
-        st.session_state.valid = True
-        st.toast("Login Successful!", icon="✅")
-        st.balloons()
-        time.sleep(2)
-        st.rerun()
-      else:
-        st.toast("Invalid Key!", icon="🚨")
+    else:
+      st.title("Job Hunter Pro Application")
+      st.write(aboutApp)
+      key = st.number_input('Enter a valid password', min_value=1000, max_value=9999, step=1, placeholder=1000)
+      if st.button('Start App'):
+        st.session_state.entered_key = key
+        if key in st.secrets['PASSWORDS']:
+          st.session_state.valid = True
+          st.toast("Login Successful!", icon="✅")
+          st.balloons()
+          time.sleep(2)
+          st.rerun()
+        else:
+          st.toast("Invalid Key!", icon="🚨")
+  if st.secrets.get('METRICS_FILE'):
+    metrics.writeExposition(st.secrets['METRICS_FILE'])
@@ -0,0 +1,58 @@
+from streamlit.testing.v1 import AppTest
+import argparse
+import sys
+
+from benchmarks.fakes import FakeChatServer
+from benchmarks.run import workdir
+
+PROMPT = "Can you provide a comprehensive overview of Atlantis?"
+
+def script():
+  import streamlit as st
+  from main.about_company import OPENAI_MODEL, cached_response, open_ai_response
+  st.session_state.responses = [
+    cached_response('openai', OPENAI_MODEL, st.session_state.prompt, open_ai_response, st.session_state.refresh)
+    for _ in range(st.session_state.calls)
+  ]
+
+def runScript(server, calls, refresh=False):
+  app = AppTest.from_function(script, default_timeout=30)
+  app.secrets['OPEN_AI_BASE_URL'] = server.base_url
+  app.session_state.open_ai_api_key = 'fake-key'
+  app.session_state.prompt = PROMPT
+  app.session_state.calls = calls
+  app.session_state.refresh = refresh
+  app.run()
+  assert not app.exception, app.exception
+  return app
+
+def main():
+  parser = argparse.ArgumentParser(description="Run the OpenAI response path against a local fake chat-completions server.")
+  parser.parse_args()
+  server = FakeChatServer()
+  expected = ''.join(server.chunks)
+  try:
+    with workdir():
+      app = runScript(server, 2)
+      assert app.session_state.responses == [expected, expected], app.session_state.responses
+      assert len(server.requests) == 1, f"expected one request, the repeat served from cache; got {len(server.requests)}"
+      request = server.requests[0]
+      assert request['stream'] and request['messages'] == [{'role': 'user', 'content': PROMPT}], request
+
+      runScript(server, 1, refresh=True)
+      assert len(server.requests) == 2, "regenerating should skip the cache"
+
+      # The client retries rate limits on its own; fail every attempt so the error reaches the page.
+      server.failures = 10
+      app = runScript(server, 1, refresh=True)
+      assert app.session_state.responses == [None], app.session_state.responses
+      assert any("usage limit" in error.value for error in app.error), [error.value for error in app.error]
+      server.failures = 0
+      app = runScript(server, 1)
+      assert app.session_state.responses == [expected], "a failed regeneration should leave the cached response in place"
+  finally:
+    server.shutdown()
+  print("openai: streamed once, cached repeat, surfaced rate limits", file=sys.stderr)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,68 @@
+import pandas as pd
+import argparse
+import time
+import sys
+
+from benchmarks.data import generateDataset
+from benchmarks.fakes import FakeDriveService
+from benchmarks.run import REMOTE_FILE, openDataset, workdir
+from main.drive_sync import DriveSyncWorker
+from main.journal import readJournal
+from main.metrics import metrics
+from main.storage import BACKENDS
+
+DEBOUNCE = 0.5
+TIMEOUT = 30
+
+def waitSynced(worker, service, uploads):
+  deadline = time.time() + TIMEOUT
+  while time.time() < deadline:
+    if service.uploads >= uploads and not worker.pending and not readJournal():
+      # Give a stray second upload time to show up before the caller counts them.
+      time.sleep(DEBOUNCE * 2)
+      return
+    time.sleep(0.05)
+  raise AssertionError(f"not synced after {TIMEOUT}s: pending={worker.pending}, uploads={service.uploads}, error={worker.last_error}")
+
+def editBurst(dataset, worker, names, status):
+  for name in names:
+    label, info = dataset.findRow('HR', name)
+    dataset.applyEdit((info['hr_name'], info['company_name']), {'status': status}, dataset.rowVersion(label))
+    worker.notify()
+
+def failureCount():
+  return metrics.counters.get(('drive_sync_failures', ()), 0)
+
+def checkBackend(backend):
+  service = FakeDriveService(REMOTE_FILE)
+  dataset = openDataset(backend, service).get()
+  worker = DriveSyncWorker(dataset, lambda: service, 'benchmark', interval=0, debounce=DEBOUNCE, backoff_base=0.01)
+  names = dataset.names('HR')[:20]
+
+  editBurst(dataset, worker, names, 'In Talks')
+  waitSynced(worker, service, 1)
+  assert service.uploads == 1, f"a burst of {len(names)} edits took {service.uploads} uploads"
+
+  service.failures = 2
+  failures = failureCount()
+  editBurst(dataset, worker, names, 'Invitation Sent')
+  waitSynced(worker, service, 2)
+  assert service.uploads == 2, f"expected one upload after the outage, got {service.uploads - 1}"
+  assert failureCount() - failures == 2, f"expected 2 failed attempts, counted {failureCount() - failures}"
+  assert worker.failures == 0 and worker.last_error is None, f"worker still failing: {worker.last_error}"
+  uploaded = (pd.read_csv(REMOTE_FILE)['status'] == 'Invitation Sent').sum()
+  assert uploaded == dataset.statusQuery(('Invitation Sent', (), None))[0], "the uploaded CSV is missing the second burst"
+
+def main():
+  parser = argparse.ArgumentParser(description="Drive the Drive sync worker against a fake Drive service.")
+  parser.add_argument('--rows', type=int, default=1000)
+  parser.add_argument('--backend', choices=list(BACKENDS), action='append', help="Backend to check, may be repeated (default: all).")
+  args = parser.parse_args()
+  for backend in args.backend or list(BACKENDS):
+    with workdir():
+      generateDataset(args.rows).to_csv(REMOTE_FILE, index=False)
+      checkBackend(backend)
+    print(f"{backend}: one upload per burst, recovered after failures", file=sys.stderr)
+
+if __name__ == '__main__':
+  main()
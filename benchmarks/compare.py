@@ -0,0 +1,36 @@
+import argparse
+import json
+
+def loadResults(path):
+  with open(path, encoding='utf-8') as f:
+    report = json.load(f)
+  return {(result['case'], result['backend'], result['rows']): result for result in report['results']}
+
+def megabytes(value):
+  return f"{value:>10.1f}" if value is not None else f"{'-':>10}"
+
+def main():
+  parser = argparse.ArgumentParser(description="Compare two benchmark reports produced by benchmarks.run.")
+  parser.add_argument('baseline')
+  parser.add_argument('candidate')
+  parser.add_argument('--threshold', type=float, default=1.25, help="Slowdown ratio that counts as a regression.")
+  args = parser.parse_args()
+
+  baseline, candidate = loadResults(args.baseline), loadResults(args.candidate)
+  regressions = []
+  print(f"{'case':<28}{'backend':<8}{'rows':>9}{'base s':>11}{'new s':>11}{'ratio':>8}{'base MB':>10}{'new MB':>10}")
+  for key in sorted(baseline.keys() & candidate.keys(), key=lambda k: (k[2], k[1], k[0])):
+    old, new = baseline[key], candidate[key]
+    ratio = new['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+    loaded = sorted(set(new.get('heavy_modules', [])) - set(old.get('heavy_modules', [])))
+    flag = ' !' if ratio > args.threshold or loaded else ''
+    print(f"{key[0]:<28}{key[1]:<8}{key[2]:>9}{old['seconds']:>11.4f}{new['seconds']:>11.4f}{ratio:>8.2f}{megabytes(old['peak_mb'])}{megabytes(new['peak_mb'])}{flag}")
+    if loaded:
+      print(f"  now imports {', '.join(loaded)}")
+    if flag:
+      regressions.append(key)
+  if regressions:
+    raise SystemExit(f"{len(regressions)} case(s) slower than {args.threshold}x the baseline")
+
+if __name__ == '__main__':
+  main()
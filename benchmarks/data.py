@@ -0,0 +1,57 @@
+import pandas as pd
+import numpy as np
+import argparse
+
+from main.schema import COLUMNS, STATUS_OPTIONS
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rohan', 'Isha', 'John', 'Emma', 'Liam', 'Olivia', 'Noah', 'Mia']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Iyer', 'Reddy', 'Nair', 'Singh', 'Patel', 'Smith', 'Johnson', 'Brown', 'Williams', 'Garcia', 'Miller']
+JOB_TITLES = ['HR Manager', 'Talent Acquisition Specialist', 'Technical Recruiter', 'HR Business Partner', 'Head of People', 'Campus Recruiter']
+NICHES = ['FinTech', 'EdTech', 'HealthTech', 'SaaS', 'E-commerce', 'AI/ML', 'Cybersecurity', 'Gaming', 'Logistics', 'Consulting']
+LOCATIONS = ['Bengaluru', 'Hyderabad', 'Pune', 'Gurugram', 'Noida', 'Mumbai', 'Chennai', 'Remote', 'San Francisco', 'London', 'Berlin', 'Singapore']
+
+def generateDataset(rows, seed=0, contacts_per_company=4):
+  rng = np.random.default_rng(seed)
+  companies = max(1, rows // contacts_per_company)
+  company_ids = rng.integers(0, companies, rows)
+  company_names = np.char.add('Company ', company_ids.astype(str))
+  slugs = np.char.add('company', company_ids.astype(str))
+  first = rng.choice(FIRST_NAMES, rows)
+  last = rng.choice(LAST_NAMES, rows)
+  hr_names = np.char.add(np.char.add(np.char.add(first, ' '), last), np.char.add(' ', np.arange(rows).astype(str)))
+  handles = np.char.add(np.char.lower(first), np.arange(rows).astype(str))
+
+  data = pd.DataFrame({
+    'hr_name': hr_names,
+    'hr_job_title': rng.choice(JOB_TITLES, rows),
+    'hr_email': np.char.add(np.char.add(handles, '@'), np.char.add(slugs, '.com')),
+    'hr_phone': np.char.add('+91', rng.integers(6_000_000_000, 9_999_999_999, rows).astype(str)),
+    'hr_linkedin_username': handles,
+    'hr_twitter_username': handles,
+    'hr_facebook_username': handles,
+    'company_name': company_names,
+    'company_website': np.char.add(np.char.add('https://', slugs), '.com'),
+    'company_email': np.char.add(np.char.add('careers@', slugs), '.com'),
+    'company_linkedin_username': slugs,
+    'company_twitter_username': slugs,
+    'company_facebook_username': slugs,
+    'company_location': np.array(LOCATIONS)[company_ids % len(LOCATIONS)],
+    'company_niche': np.array(NICHES)[company_ids % len(NICHES)],
+    'status': rng.choice(STATUS_OPTIONS, rows, p=[0.6, 0.3, 0.1]),
+    'job_status': rng.random(rows) < 0.4,
+    'linkedin_status': rng.random(rows) < 0.6,
+    'twitter_status': rng.random(rows) < 0.2,
+    'facebook_status': rng.random(rows) < 0.1
+  })
+  return data[COLUMNS]
+
+def main():
+  parser = argparse.ArgumentParser(description="Write a synthetic job_data.csv with the real 20-column schema.")
+  parser.add_argument('--rows', type=int, default=1000)
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--out', default='job_data.csv')
+  args = parser.parse_args()
+  generateDataset(args.rows, args.seed).to_csv(args.out, index=False)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,91 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import hashlib
+import shutil
+import json
+
+class FakeRequest:
+  def __init__(self, result):
+    self.result = result
+
+  def execute(self):
+    return self.result()
+
+class FakeFiles:
+  def __init__(self, service):
+    self.service = service
+
+  def get(self, fileId, fields=None):
+    return FakeRequest(lambda: self.service.metadata())
+
+  def update(self, fileId, media_body=None, body=None, fields=None):
+    def upload():
+      if self.service.failures:
+        self.service.failures -= 1
+        raise ConnectionError("fake Drive outage")
+      self.service.uploads += 1
+      if media_body is not None:
+        shutil.copyfile(media_body._filename, self.service.path)
+      return self.service.metadata()
+    return FakeRequest(upload)
+
+class FakeDriveService:
+  # Stands in for the googleapiclient Drive v3 service, backed by one local file.
+  def __init__(self, path):
+    self.path = path
+    self.uploads = 0
+    # Uploads fail while this is positive, one failure per attempt.
+    self.failures = 0
+
+  def metadata(self):
+    with open(self.path, 'rb') as f:
+      md5 = hashlib.md5(f.read()).hexdigest()
+    return {'md5Checksum': md5, 'version': str(self.uploads + 1)}
+
+  def files(self):
+    return FakeFiles(self)
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+  def do_POST(self):
+    server = self.server
+    body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+    with server.lock:
+      server.requests.append(body)
+      failing = server.failures > 0
+      if failing:
+        server.failures -= 1
+    if failing:
+      self.send_response(429)
+      self.send_header('Content-Type', 'application/json')
+      self.end_headers()
+      self.wfile.write(json.dumps({'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}}).encode())
+      return
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/event-stream')
+    self.end_headers()
+    for chunk in server.chunks:
+      event = {
+        'id': 'fake', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'],
+        'choices': [{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}]
+      }
+      self.wfile.write(f'data: {json.dumps(event)}\n\n'.encode())
+      self.wfile.flush()
+    self.wfile.write(b'data: [DONE]\n\n')
+
+  def log_message(self, *args):
+    pass
+
+class FakeChatServer(ThreadingHTTPServer):
+  # Streams a fixed reply the way the OpenAI chat-completions endpoint does, on a free local port.
+  def __init__(self, chunks=('Fake', ' company', ' overview.')):
+    super().__init__(('127.0.0.1', 0), FakeChatHandler)
+    self.chunks = chunks
+    self.requests = []
+    # Requests are answered with HTTP 429 while this is positive, one per request.
+    self.failures = 0
+    self.lock = threading.Lock()
+    threading.Thread(target=self.serve_forever, daemon=True).start()
+
+  @property
+  def base_url(self):
+    return f'http://127.0.0.1:{self.server_address[1]}/v1'
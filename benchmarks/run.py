@@ -0,0 +1,260 @@
+from datetime import datetime, timezone
+import pandas as pd
+import numpy as np
+import statistics
+import contextlib
+import tracemalloc
+import subprocess
+import platform
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import re
+import sys
+import os
+
+from benchmarks.data import generateDataset
+from benchmarks.fakes import FakeDriveService
+from main.about_company import company_prompt
+from main.dataset import DATA_FILE
+from main.my_status import labelPage
+from main.schema import STATUS_OPTIONS, normalizeRows
+from main.storage import BACKENDS, createDataset
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TARGETS = ['main.storage', 'main.company_hr_info', 'main.about_company', 'main.my_status']
+# pandas already imports the pyarrow core, so only the feather reader added for the dataset cache is tracked.
+HEAVY_MODULES = ['openai', 'google.generativeai', 'googleapiclient', 'google.oauth2', 'gdown', 'pyarrow.feather']
+IMPORT_PROBE = '''
+import resource, json, time, sys
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+  'seconds': seconds, 'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+  'heavy_modules': [name for name in {heavy!r} if name in sys.modules]
+}}))
+'''
+# Importing app.py skips its __main__ block, so the login screen is measured by running the script once.
+FIRST_RUN_PROBE = '''
+import resource, json, time, sys
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({script!r}, default_timeout=60)
+app.secrets['PASSWORDS'] = [1234]
+app.secrets['SECRET_KEY'] = 1234
+app.secrets['JOB_DATA'] = 'benchmark'
+start = time.perf_counter()
+app.run()
+seconds = time.perf_counter() - start
+heavy_modules = [name for name in {heavy!r} if name in sys.modules]
+if app.exception:
+  sys.exit('login screen failed with %s loaded: %s' % (heavy_modules, app.exception[0].message))
+print(json.dumps({{
+  'seconds': seconds, 'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 'heavy_modules': heavy_modules
+}}))
+'''
+REMOTE_FILE = 'remote.csv'
+FILTERS = [
+  ('All', (), None),
+  ('In Talks', (), None),
+  ('All', ('job_status', 'linkedin_status'), None),
+  ('Invitation Sent', ('job_status',), None)
+]
+
+TRACE_MEMORY = False
+
+def memoryStatus(field):
+  with open('/proc/self/status', encoding='utf-8') as f:
+    return int(re.search(rf'^{field}:\s+(\d+) kB', f.read(), re.MULTILINE).group(1)) / 1024
+
+def resetPeakRss():
+  # Writing 5 to clear_refs resets the kernel's resident high-water mark (VmHWM), so each case gets a peak of its own.
+  try:
+    with open('/proc/self/clear_refs', 'w') as f:
+      f.write('5')
+  except OSError:
+    return None
+  return memoryStatus('VmRSS')
+
+def measure(fn, repeat=1, ops=1):
+  timings = []
+  # tracemalloc hooks every allocation and slows pure-Python paths several times over, so by default the peak is
+  # taken from the process's resident memory instead, which costs nothing while the case runs.
+  if TRACE_MEMORY:
+    tracemalloc.start()
+  else:
+    baseline = resetPeakRss()
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn()
+    timings.append(time.perf_counter() - start)
+  peak = None
+  if TRACE_MEMORY:
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+  elif baseline is not None:
+    peak = max(0.0, memoryStatus('VmHWM') - baseline)
+  timings.sort()
+  median = statistics.median(timings)
+  return {
+    'seconds': median,
+    'p95_seconds': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    'ops_per_sec': ops / median if median else None,
+    'peak_mb': peak,
+    'repeat': repeat
+  }
+
+def measureProbe(probe, repeat):
+  # Every sample is a fresh interpreter, since a second import in the same process is just a sys.modules lookup.
+  samples = []
+  for _ in range(repeat):
+    process = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True)
+    if process.returncode:
+      raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    samples.append(json.loads(process.stdout.strip().splitlines()[-1]))
+  timings = sorted(sample['seconds'] for sample in samples)
+  return {
+    'seconds': statistics.median(timings),
+    'p95_seconds': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    'ops_per_sec': None,
+    'peak_mb': max(sample['rss_mb'] for sample in samples),
+    'repeat': repeat,
+    'heavy_modules': samples[-1]['heavy_modules']
+  }
+
+def openDataset(backend, service):
+  dataset = createDataset(backend, lambda: service, 'benchmark')
+  dataset._download = lambda: shutil.copyfile(service.path, DATA_FILE)
+  return dataset
+
+def benchmarkBackend(backend, rows, repeat, samples):
+  service = FakeDriveService(REMOTE_FILE)
+  results = {}
+  holder = {}
+
+  def coldLoad():
+    holder['dataset'] = openDataset(backend, service).get()
+  results['load_cold'] = measure(coldLoad)
+  def warmLoad():
+    holder['dataset'] = openDataset(backend, service).get()
+  results['load_warm'] = measure(warmLoad, repeat)
+  dataset = holder['dataset']
+
+  rng = np.random.default_rng(1)
+  hr_names = dataset.names('HR')
+  picks = [hr_names[i] for i in rng.integers(0, len(hr_names), samples)]
+
+  def names():
+    dataset.version += 1
+    dataset.names('HR')
+    dataset.names('Company')
+  results['select_names'] = measure(names, repeat)
+  results['select_row'] = measure(lambda: [dataset.findRow('HR', name) for name in picks], repeat, samples)
+
+  def searchIndex():
+    dataset._search = None
+    dataset.searchIndex()
+  results['search_index'] = measure(searchIndex, repeat)
+  queries = [' '.join(name.split(' ')[:2]).lower() for name in picks]
+  results['search'] = measure(lambda: [dataset.search('HR', query) for query in queries], repeat, samples)
+
+  def statusFilters():
+    for filters in FILTERS:
+      dataset.version += 1
+      dataset.statusQuery(filters)
+  results['status_filter'] = measure(statusFilters, repeat, len(FILTERS))
+  search = ('All', (), picks[0].split(' ')[0])
+  def statusSearch():
+    dataset.version += 1
+    dataset.statusQuery(search)
+  results['status_search'] = measure(statusSearch, repeat)
+  total = dataset.statusQuery(FILTERS[0])[0]
+  offsets = rng.integers(0, max(1, total - 20), samples)
+  results['status_page'] = measure(lambda: [labelPage(dataset.statusPage(FILTERS[0], int(offset), 20)) for offset in offsets], repeat, samples)
+
+  def edits():
+    for name in picks:
+      label, info = dataset.findRow('HR', name)
+      row = {'status': STATUS_OPTIONS[int(rng.integers(0, 3))], 'job_status': bool(rng.integers(0, 2))}
+      dataset.applyEdit((info['hr_name'], info['company_name']), row, dataset.rowVersion(label))
+  results['save_edit'] = measure(edits, 1, samples)
+  results['bulk_update'] = measure(lambda: dataset.bulkUpdate(FILTERS[3], {'status': 'In Talks', 'linkedin_status': True}), repeat)
+  imports = normalizeRows(generateDataset(samples, seed=2).assign(hr_name=lambda rows: 'Imported ' + rows['hr_name']))
+  results['bulk_import'] = measure(lambda: dataset.importRows(imports), 1, samples)
+  results['save_export'] = measure(dataset.exportSnapshot, repeat)
+
+  companies = dataset.companies()
+  prompt_rows = [companies.iloc[i] for i in rng.integers(0, len(companies), samples)]
+  results['create_prompt'] = measure(lambda: [company_prompt(row) for row in prompt_rows], repeat, samples)
+  return results
+
+def gitRevision():
+  try:
+    return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+@contextlib.contextmanager
+def workdir():
+  previous = os.getcwd()
+  path = tempfile.mkdtemp(prefix='job-hunter-bench-')
+  os.chdir(path)
+  try:
+    yield path
+  finally:
+    os.chdir(previous)
+    shutil.rmtree(path, ignore_errors=True)
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the data-access paths against synthetic datasets.")
+  parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+  parser.add_argument('--backend', choices=list(BACKENDS), action='append', help="Backend to benchmark, may be repeated (default: all).")
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument('--samples', type=int, default=200, help="Lookups, edits and prompts per timed iteration.")
+  parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+  parser.add_argument('--skip-imports', action='store_true', help="Don't measure the login screen's first run or cold imports of the page modules.")
+  parser.add_argument('--trace-memory', action='store_true', help="Record tracemalloc peaks instead of resident memory peaks (inflates timings; compare like with like).")
+  args = parser.parse_args()
+  global TRACE_MEMORY
+  TRACE_MEMORY = args.trace_memory
+
+  report = {
+    'meta': {
+      'timestamp': datetime.now(timezone.utc).isoformat(),
+      'git_revision': gitRevision(),
+      'python': platform.python_version(),
+      'pandas': pd.__version__,
+      'platform': platform.platform(),
+      'trace_memory': args.trace_memory,
+      'peak_memory': 'tracemalloc' if args.trace_memory else 'rss'
+    },
+    'results': []
+  }
+  if not args.skip_imports:
+    probe = FIRST_RUN_PROBE.format(script=os.path.join(ROOT, 'app.py'), heavy=HEAVY_MODULES)
+    report['results'].append({'case': 'first_run:app', 'backend': 'python', 'rows': 0, **measureProbe(probe, args.repeat)})
+    for module in IMPORT_TARGETS:
+      probe = IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+      report['results'].append({'case': f'import:{module}', 'backend': 'python', 'rows': 0, **measureProbe(probe, args.repeat)})
+    print("imports done", file=sys.stderr)
+  for rows in args.sizes:
+    for backend in args.backend or list(BACKENDS):
+      with workdir():
+        generateDataset(rows).to_csv(REMOTE_FILE, index=False)
+        results = benchmarkBackend(backend, rows, args.repeat, args.samples)
+      for case, metrics in results.items():
+        report['results'].append({'case': case, 'backend': backend, 'rows': rows, **metrics})
+      print(f"{backend} {rows} rows done", file=sys.stderr)
+
+  output = json.dumps(report, indent=2)
+  if args.output:
+    with open(args.output, 'w', encoding='utf-8') as f:
+      f.write(output + '\n')
+  else:
+    print(output)
+
+if __name__ == '__main__':
+  main()
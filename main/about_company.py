@@ -1,6 +1,11 @@
-import google.generativeai as genai
-from openai import OpenAI
 import streamlit as st
+import time
+
+from main.llm_cache import getResponseCache
+from main.metrics import metrics
+
+OPENAI_MODEL = "gpt-3.5-turbo"
+GEMINI_MODEL = "gemini-1.5-flash"
 
 def create_prompt(company, website, linkedin, twitter, facebook, location, niche):
     prompt = f"Can you provide a comprehensive overview of {company} that includes the following information:\n\n"
@@ -78,72 +83,87 @@ def create_prompt(company, website, linkedin, twitter, facebook, location, niche
     return prompt
 
 def open_ai_response(prompt):
-    client = OpenAI(api_key=st.session_state.open_ai_api_key)
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response['choices'][0]['message']['content']
-    except Exception as e:
-        if "Rate limit" in str(e):
-            st.error("You have exceeded your API usage limit. Please try again later.", icon="🚨")
-        elif "Invalid request" in str(e):
-            st.error("Invalid request: Please check your input.", icon="🚨")
-        elif "Authentication" in str(e):
-            st.error("Authentication error. Please check your API key.", icon="🚨")
-        else:
-            st.error(f"An unexpected error occurred: {str(e)}", icon="🚨")
+    from openai import OpenAI
+    client = OpenAI(api_key=st.session_state.open_ai_api_key, base_url=st.secrets.get('OPEN_AI_BASE_URL') or None)
+    stream = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
 
 def gemini_response(prompt):
+    import google.generativeai as genai
     genai.configure(api_key=st.session_state.gemini_api_key)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    for chunk in model.generate_content(prompt, stream=True):
+        yield chunk.text
+
+def show_llm_error(e):
+    if "Rate limit" in str(e):
+        st.error("You have exceeded your API usage limit. Please try again later.", icon="🚨")
+    elif "Invalid request" in str(e):
+        st.error("Invalid request: Please check your input.", icon="🚨")
+    elif "Authentication" in str(e):
+        st.error("Authentication error. Please check your API key.", icon="🚨")
+    else:
+        st.error(f"An unexpected error occurred: {str(e)}", icon="🚨")
+
+def timed_stream(provider, chunks):
+    start = time.perf_counter()
+    for position, chunk in enumerate(chunks):
+        if position == 0:
+            metrics.observe(f'llm.{provider}.first_token', time.perf_counter() - start)
+        yield chunk
+
+def cached_response(provider, model, prompt, stream, refresh):
+    cache = getResponseCache()
+    if not refresh:
+        response = cache.get(provider, model, prompt)
+        metrics.cacheLookup('llm_response', response is not None)
+        if response is not None:
+            st.caption("Served from cache.")
+            st.write(response)
+            return response
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        with metrics.span(f'llm.{provider}'):
+            response = st.write_stream(timed_stream(provider, stream(prompt)))
     except Exception as e:
-        if "Rate limit" in str(e):
-            st.error("You have exceeded your API usage limit. Please try again later.", icon="🚨")
-        elif "Invalid request" in str(e):
-            st.error("Invalid request: Please check your input.", icon="🚨")
-        elif "Authentication" in str(e):
-            st.error("Authentication error. Please check your API key.", icon="🚨")
-        else:
-            st.error(f"An unexpected error occurred: {str(e)}", icon="🚨")
+        metrics.count('llm_errors', provider=provider)
+        show_llm_error(e)
+        return None
+    if response:
+        cache.put(provider, model, prompt, response)
+    return response
+
+def company_prompt(row):
+    return create_prompt(
+        row['company_name'], row['company_website'], row['company_linkedin_username'], row['company_twitter_username'],
+        row['company_facebook_username'], row['company_location'], row['company_niche']
+    )
 
 def get_company_info(company, selected_company_data):
-    website = selected_company_data['company_website'].values[0]
-    linkedin = selected_company_data['company_linkedin_username'].values[0]
-    twitter = selected_company_data['company_twitter_username'].values[0]
-    facebook = selected_company_data['company_facebook_username'].values[0]
-    location = selected_company_data['company_location'].values[0]
-    niche = selected_company_data['company_niche'].values[0]
-
     prompt_provided = st.expander("Prompt Provided", expanded=False)
     with prompt_provided:
-        prompt = create_prompt(company, website, linkedin, twitter, facebook, location, niche)
+        prompt = company_prompt(selected_company_data.iloc[0])
         st.write(prompt)
 
+    refresh = st.checkbox("Regenerate instead of using the cached response")
+
     if st.button("Get OpenAI Response"):
-        openai_expander = st.expander("OpenAI Response", expanded=False)
-        with openai_expander:
-            response = open_ai_response(prompt)
-            if response is not None:
-                st.write(response)
+        with st.expander("OpenAI Response", expanded=True):
+            cached_response("openai", OPENAI_MODEL, prompt, open_ai_response, refresh)
 
     if st.button("Get Gemini Response"):
-        gemini_expander = st.expander("Gemini Response", expanded=False)
-        with gemini_expander:
-            response = gemini_response(prompt)
-            if response is not None:
-                st.write(response)
+        with st.expander("Gemini Response", expanded=True):
+            cached_response("gemini", GEMINI_MODEL, prompt, gemini_response, refresh)
 
-def about_company(data):
+def about_company(dataset):
     st.title("Job Hunter Pro Application")
-    data = data[data['company_name'].notnull()]
-    data = data.drop_duplicates(subset='company_name')
-    company_cols = ['company_name', 'company_website', 'company_linkedin_username', 'company_twitter_username', 'company_facebook_username', 'company_location', 'company_niche']
-    company_data = data[company_cols]
+    with metrics.span('about.companies'):
+        company_data = dataset.companies()
 
     if st.session_state.get("open_ai_api_key") == "":
         if st.secrets.get('OPEN_AI_API_KEY', "") == "":
@@ -163,7 +183,11 @@ def about_company(data):
         else:
             st.session_state.gemini_api_key = st.secrets['GEMINI_API_KEY']
 
-    company = st.selectbox("Know about any company", company_data['company_name'])
+    query = st.text_input("Search companies", placeholder="Name, niche or location")
+    company = st.selectbox("Know about any company", dataset.search('Company', query))
+    if company is None:
+        st.error("No company matches your search.", icon="🚨")
+        return
     selected_company_data = company_data[company_data['company_name'] == company]
     if st.session_state.entered_key == st.secrets['SECRET_KEY']:
         get_company_info(company, selected_company_data)
@@ -1,71 +1,83 @@
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
 import streamlit as st
 import pandas as pd
-import gdown
-import time
-
-@st.cache_resource
-def getDriveService():
-  gdown.download(f"https://drive.google.com/uc?id={st.secrets['SERVICE_ACCOUNT_FILE']}", 'credentials.json', quiet=False)
-  SCOPES = ['https://www.googleapis.com/auth/drive']
-  creds = service_account.Credentials.from_service_account_file('credentials.json', scopes=SCOPES)
-  service = build('drive', 'v3', credentials=creds)
-  return service
-
-def saveData(data, info, new_row):
-  index = data.index[(data['hr_name'] == info['hr_name']) & (data['company_name'] == info['company_name'])].tolist()[0]
-  data.loc[index] = new_row.iloc[0]
-  data.to_csv('job_data.csv', index=False)
+
+from main.dataset import StaleEditError
+from main.drive_sync import getSyncWorker
+from main.metrics import metrics
+
+def formValues(info):
+  # Streamlit compares a text_input's value against "", which pd.NA can't answer.
+  return info.astype(object).where(info.notna(), "")
+
+def saveData(dataset, info, new_row, expected_version=None):
+  key = (info['hr_name'], info['company_name'])
+  # Fields that were empty and left empty stay missing instead of turning into "".
+  row = {column: None if value == "" and pd.isna(info[column]) else value for column, value in new_row.iloc[0].items()}
   try:
-    service = getDriveService()
-    media = MediaFileUpload('job_data.csv', mimetype='application/csv', resumable=True)
-    request = service.files().update(fileId=st.secrets['JOB_DATA'], media_body=media, body={'mimeType': 'application/csv'})
-    response = request.execute()
-    st.success("File updated successfully!", icon="✅")
-    return response
-  except Exception as e:
-    st.error(f"An error occurred while uploading: {e}", icon="🚫")
+    with metrics.span('hr_info.save'):
+      dataset.applyEdit(key, row, expected_version)
+  except StaleEditError as e:
+    metrics.count('stale_edits')
+    st.session_state.save_message = ('error', f"Details were not saved because {e}. Reload it and edit again.")
     return None
+  except OSError as e:
+    st.session_state.save_message = ('error', f"An error occurred while saving: {e}")
+    return None
+  metrics.count('edits_saved')
+  getSyncWorker().notify()
+  st.session_state.save_message = ('success', "Details saved, syncing to Drive in the background.")
+  return True
+
+def showSaveMessage():
+  # Saving is followed by a rerun, so the outcome is kept in the session and shown on the next run.
+  kind, message = st.session_state.pop('save_message', (None, None))
+  if kind == 'error':
+    st.error(message, icon="🚫")
+  elif kind == 'success':
+    st.success(message, icon="✅")
 
-def company_hr_info(data):
+def company_hr_info(dataset):
   st.subheader("Company/HR Contact Information")
+  showSaveMessage()
   category = st.radio("Filter data based on:", ['HR', 'Company'])
-  if category == 'HR':
-    hr_names = sorted(data["hr_name"].astype(str).unique())
-    choice = st.selectbox("Select an HR", hr_names)
-    raw_data = data[data["hr_name"] == choice]
-  else:
-    company_names = sorted(data["company_name"].astype(str).unique())
-    choice = st.selectbox("Select a Company", company_names)
-    raw_data = data[data["company_name"] == choice]
-  info = raw_data.iloc[0]
+  query = st.text_input("Search", placeholder="Name, company, job title, niche, location or email")
+  with metrics.span('hr_info.select_box'):
+    if category == 'HR':
+      choice = st.selectbox("Select an HR", dataset.search('HR', query))
+    else:
+      choice = st.selectbox("Select a Company", dataset.search('Company', query))
+  with metrics.span('hr_info.find_row'):
+    label, info = dataset.findRow(category, choice)
+  if info is None:
+    st.error("No Data Found!", icon="🚨")
+    return
+  key = (info['hr_name'], info['company_name'])
+  values = formValues(info)
 
   st.divider()
-  name = st.text_input("Name of the HR", value=info['hr_name'], disabled=st.session_state.edit)
+  name = st.text_input("Name of the HR", value=values['hr_name'], disabled=st.session_state.edit)
   cola, colb = st.columns(2)
   with cola:
-    new_job_title = st.text_input("Job Title", value=info['hr_job_title'], disabled=st.session_state.edit)
-    new_email = st.text_input("Email ID", value=info['hr_email'], disabled=st.session_state.edit)
-    new_phone = st.text_input("Contact No.", value=info['hr_phone'], disabled=st.session_state.edit)
+    new_job_title = st.text_input("Job Title", value=values['hr_job_title'], disabled=st.session_state.edit)
+    new_email = st.text_input("Email ID", value=values['hr_email'], disabled=st.session_state.edit)
+    new_phone = st.text_input("Contact No.", value=values['hr_phone'], disabled=st.session_state.edit)
   with colb:
-    new_linkedin_username = st.text_input("LinkedIn Username", value=info['hr_linkedin_username'], disabled=st.session_state.edit)
-    new_twitter_username = st.text_input("Twitter Username", value=info['hr_twitter_username'], disabled=st.session_state.edit)
-    new_facebook_username = st.text_input("Facebook Username", value=info['hr_facebook_username'], disabled=st.session_state.edit)
+    new_linkedin_username = st.text_input("LinkedIn Username", value=values['hr_linkedin_username'], disabled=st.session_state.edit)
+    new_twitter_username = st.text_input("Twitter Username", value=values['hr_twitter_username'], disabled=st.session_state.edit)
+    new_facebook_username = st.text_input("Facebook Username", value=values['hr_facebook_username'], disabled=st.session_state.edit)
 
   st.divider()
-  new_company_name = st.text_input("Name of the Company", value=info['company_name'], disabled=st.session_state.edit)
-  new_company_niche = st.text_input("Company Niche", value=info['company_niche'], disabled=st.session_state.edit)
+  new_company_name = st.text_input("Name of the Company", value=values['company_name'], disabled=st.session_state.edit)
+  new_company_niche = st.text_input("Company Niche", value=values['company_niche'], disabled=st.session_state.edit)
   colx, coly = st.columns(2)
   with colx:
-    new_company_website = st.text_input("Company Website URL", value=info['company_website'], disabled=st.session_state.edit)
-    new_company_email = st.text_input("Company Email", value=info['company_email'], disabled=st.session_state.edit)
-    new_company_location = st.text_input("Company Location", value=info['company_location'], disabled=st.session_state.edit)
+    new_company_website = st.text_input("Company Website URL", value=values['company_website'], disabled=st.session_state.edit)
+    new_company_email = st.text_input("Company Email", value=values['company_email'], disabled=st.session_state.edit)
+    new_company_location = st.text_input("Company Location", value=values['company_location'], disabled=st.session_state.edit)
   with coly:
-    new_company_linkedin_username = st.text_input("Company LinkedIn Username", value=info['company_linkedin_username'], disabled=st.session_state.edit)
-    new_company_twitter_username = st.text_input("Company Twitter Username", value=info['company_twitter_username'], disabled=st.session_state.edit)
-    new_company_facebook_username = st.text_input("Company Facebook Username", value=info['company_facebook_username'], disabled=st.session_state.edit)
+    new_company_linkedin_username = st.text_input("Company LinkedIn Username", value=values['company_linkedin_username'], disabled=st.session_state.edit)
+    new_company_twitter_username = st.text_input("Company Twitter Username", value=values['company_twitter_username'], disabled=st.session_state.edit)
+    new_company_facebook_username = st.text_input("Company Facebook Username", value=values['company_facebook_username'], disabled=st.session_state.edit)
 
   if st.session_state.entered_key == st.secrets['SECRET_KEY']:
 
@@ -89,9 +101,13 @@ def company_hr_info(data):
 
       if st.button("Edit Details", key="edit_btn"):
         st.session_state.edit = False
+        st.session_state.edit_key = None
         st.rerun()
 
     else:
+      if st.session_state.get('edit_key') != key:
+        st.session_state.edit_key = key
+        st.session_state.edit_version = dataset.rowVersion(label)
       my_status = st.selectbox("My Status", ['No Openings', 'Invitation Sent', 'In Talks'])
       applied_for_job = st.checkbox("Have you applied for internship or job?")
       my_linkedin_status = st.checkbox("Have you contact HR/Company on LinkedIn?")
@@ -113,13 +129,12 @@ def company_hr_info(data):
             'linkedin_status': my_linkedin_status, 'twitter_status': my_twitter_status, 'facebook_status': my_facebook_status
           }])
           st.toast("Form Submitted Successfully.", icon="✅")
-          time.sleep(1)
-          response = saveData(data, info, new_row)
+          response = saveData(dataset, info, new_row, st.session_state.edit_version)
+          st.session_state.edit_key = None
           if response is not None:
             st.toast("Data Saved Successfully!", icon="✅")
           else:
             st.toast("Data is not Saved!", icon="🚨")
-          time.sleep(2)
           st.rerun()
         else:
           st.toast("Invalid Key!", icon="🚨")
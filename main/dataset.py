@@ -0,0 +1,204 @@
+from abc import ABC, abstractmethod
+import pandas as pd
+import threading
+import json
+import time
+import os
+
+from main.journal import truncateJournal
+from main.metrics import metrics
+from main.schema import NAME_COLUMNS
+from main.search import SEARCH_FIELDS, SEARCH_LIMIT, SearchIndex
+
+DATA_FILE = 'job_data.csv'
+META_FILE = 'job_data.meta.json'
+META_FIELDS = 'md5Checksum,version,modifiedTime'
+REFRESH_TTL = 60
+MEMO_SIZE = 64
+
+def readMeta():
+  if not os.path.exists(META_FILE):
+    return {}
+  with open(META_FILE, encoding='utf-8') as f:
+    return json.load(f)
+
+def writeMeta(meta):
+  with open(META_FILE + '.tmp', 'w', encoding='utf-8') as f:
+    json.dump(meta, f)
+  os.replace(META_FILE + '.tmp', META_FILE)
+
+def fetchRemoteMeta(service, file_id):
+  return service.files().get(fileId=file_id, fields=META_FIELDS).execute()
+
+def sameValue(a, b):
+  if pd.isna(a) or pd.isna(b):
+    return pd.isna(a) and pd.isna(b)
+  return a == b
+
+def searchChanged(current, row):
+  return any(column in row and not sameValue(current[column], row[column]) for column in SEARCH_FIELDS)
+
+def namesChanged(key, row):
+  return str(row.get('hr_name', key[0])) != str(key[0]) or str(row.get('company_name', key[1])) != str(key[1])
+
+class StaleEditError(Exception):
+  pass
+
+class Dataset(ABC):
+  def __init__(self, service_factory, file_id, ttl=REFRESH_TTL):
+    self.service_factory = service_factory
+    self.file_id = file_id
+    self.ttl = ttl
+    self.path = DATA_FILE
+    self.lock = threading.RLock()
+    # Serializes refreshes, downloads and snapshot uploads, which touch the network and the CSV on disk but not the in-memory copy.
+    self.refreshing = threading.RLock()
+    self.meta = readMeta()
+    self.loaded = False
+    self.version = 0
+    self.generation = 0
+    self.checked_at = 0
+    self._memo = {}
+    self._search = None
+
+  def get(self):
+    if not self.loaded or time.time() - self.checked_at >= self.ttl:
+      # Once something is loaded, a session that finds a refresh already running keeps serving the current copy.
+      self.refresh(wait=not self.loaded)
+    return self
+
+  def openLocal(self):
+    with self.refreshing:
+      if not self.loaded:
+        self._reload(False)
+
+  def refresh(self, remote=None, wait=True):
+    if not self.refreshing.acquire(blocking=wait):
+      return
+    try:
+      # Sessions that queued behind another refresh find the copy already checked.
+      if remote is None and self.loaded and time.time() - self.checked_at < self.ttl:
+        return
+      self.checked_at = time.time()
+      if remote is None:
+        try:
+          with metrics.span('dataset.remote_meta'):
+            remote = fetchRemoteMeta(self.service_factory(), self.file_id)
+        except Exception:
+          # Without the metadata we can still serve whatever copy we already have.
+          remote = None
+      stale = remote is not None and remote.get('md5Checksum') != self.meta.get('md5Checksum')
+      if stale or not self.hasLocalCopy():
+        self._download()
+        self._reload(True)
+        self.meta = remote or {}
+        writeMeta(self.meta)
+      elif not self.loaded:
+        self._reload(False)
+    finally:
+      self.refreshing.release()
+
+  def _reload(self, downloaded):
+    with metrics.span('dataset.load'):
+      prepared = self.prepare(downloaded)
+      # Only swapping the new copy in (and replaying the journal onto it) has to exclude readers and edits.
+      with self.lock:
+        self.load(downloaded, prepared)
+        self.loaded = True
+        self.version += 1
+        self._search = None
+        # Row versions can't be carried across a reload, so edits started against the old copy get rejected.
+        self.generation += 1
+    metrics.count('dataset_reloads')
+
+  def _download(self):
+    import gdown
+    with metrics.span('dataset.download'):
+      gdown.download(f"https://drive.google.com/uc?id={self.file_id}", DATA_FILE + '.download', quiet=False)
+    os.replace(DATA_FILE + '.download', DATA_FILE)
+
+  def memoized(self, name, compute):
+    with self.lock:
+      key = (name, self.version)
+      metrics.cacheLookup('dataset_memo', key in self._memo)
+      if key not in self._memo:
+        self._memo = {k: v for k, v in self._memo.items() if k[1] == self.version}
+        self._memo[key] = compute()
+        if len(self._memo) > MEMO_SIZE:
+          self._memo.pop(next(iter(self._memo)))
+      return self._memo[key]
+
+  def searchIndex(self):
+    with self.lock:
+      # Built once per version of the searchable text; status and flag edits leave it alone.
+      if self._search is None:
+        with metrics.span('dataset.search_index'):
+          self._search = SearchIndex(self.searchFrame())
+      return self._search
+
+  def search(self, category, query, limit=SEARCH_LIMIT):
+    if not query or not query.strip():
+      return self.names(category)[:limit]
+    with metrics.span('dataset.search'):
+      return self.searchIndex().names(query, NAME_COLUMNS[category], limit)
+
+  def markUploaded(self, meta, count):
+    with self.lock:
+      truncateJournal(count)
+      self.meta = {field: meta[field] for field in META_FIELDS.split(',') if field in meta}
+      writeMeta(self.meta)
+
+  @abstractmethod
+  def hasLocalCopy(self):
+    pass
+
+  def prepare(self, downloaded):
+    return None
+
+  @abstractmethod
+  def load(self, downloaded, prepared):
+    pass
+
+  @abstractmethod
+  def exportSnapshot(self):
+    pass
+
+  @abstractmethod
+  def searchFrame(self):
+    pass
+
+  @abstractmethod
+  def names(self, category):
+    pass
+
+  @abstractmethod
+  def findRow(self, category, name):
+    pass
+
+  @abstractmethod
+  def companies(self):
+    pass
+
+  @abstractmethod
+  def statusQuery(self, filters):
+    pass
+
+  @abstractmethod
+  def statusPage(self, filters, offset, limit):
+    pass
+
+  @abstractmethod
+  def rowVersion(self, label):
+    pass
+
+  @abstractmethod
+  def applyEdit(self, key, row, expected_version=None):
+    pass
+
+  @abstractmethod
+  def bulkUpdate(self, filters, row):
+    pass
+
+  @abstractmethod
+  def importRows(self, rows):
+    pass
@@ -0,0 +1,15 @@
+import streamlit as st
+
+def buildDriveService():
+  from googleapiclient.discovery import build
+  from google.oauth2 import service_account
+  import gdown
+  gdown.download(f"https://drive.google.com/uc?id={st.secrets['SERVICE_ACCOUNT_FILE']}", 'credentials.json', quiet=False)
+  SCOPES = ['https://www.googleapis.com/auth/drive']
+  creds = service_account.Credentials.from_service_account_file('credentials.json', scopes=SCOPES)
+  service = build('drive', 'v3', credentials=creds)
+  return service
+
+@st.cache_resource
+def getDriveService():
+  return buildDriveService()
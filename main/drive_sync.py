@@ -0,0 +1,111 @@
+from datetime import datetime
+import streamlit as st
+import threading
+import random
+import time
+
+from main.dataset import META_FIELDS, fetchRemoteMeta
+from main.drive import buildDriveService
+from main.journal import readJournal
+from main.metrics import metrics
+from main.storage import getDataset
+
+SYNC_INTERVAL = 30
+SYNC_DEBOUNCE = 5
+MAX_RETRIES = 5
+BACKOFF_BASE = 2
+BACKOFF_CAP = 60
+
+class DriveSyncWorker:
+  def __init__(self, dataset, service_factory, file_id, interval=SYNC_INTERVAL, debounce=SYNC_DEBOUNCE, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE):
+    self.dataset = dataset
+    self.service_factory = service_factory
+    self.file_id = file_id
+    self.interval = interval
+    self.debounce = debounce
+    self.max_retries = max_retries
+    self.backoff_base = backoff_base
+    self.pending = len(readJournal())
+    self.last_synced = None
+    self.last_error = None
+    self.failures = 0
+    self._service = None
+    self._dirty = threading.Event()
+    if self.pending:
+      self._dirty.set()
+    self._thread = threading.Thread(target=self._run, name='drive-sync', daemon=True)
+    self._thread.start()
+
+  def notify(self, count=1):
+    with self.dataset.lock:
+      self.pending += count
+    self._dirty.set()
+
+  def _run(self):
+    while True:
+      self._dirty.wait()
+      # Let a burst of saves land in the journal so they go up as a single upload.
+      time.sleep(self.debounce)
+      self._dirty.clear()
+      if not self.sync():
+        self._dirty.set()
+      time.sleep(self.interval)
+
+  def sync(self):
+    for attempt in range(self.max_retries):
+      try:
+        # Hold off refreshes so the CSV isn't swapped for a download between the export and the upload.
+        with metrics.span('drive.sync'), self.dataset.refreshing:
+          self._upload()
+        self.last_error = None
+        self.failures = 0
+        return True
+      except Exception as e:
+        self.last_error = str(e)
+        self.failures += 1
+        metrics.count('drive_sync_failures')
+        if attempt + 1 < self.max_retries:
+          delay = min(BACKOFF_CAP, self.backoff_base * 2 ** attempt)
+          time.sleep(delay + random.uniform(0, delay / 2))
+    return False
+
+  def _upload(self):
+    if not readJournal():
+      with self.dataset.lock:
+        self.pending = 0
+      return None
+    if self._service is None:
+      self._service = self.service_factory()
+    # Drive v3 has no conditional update, so check the revision first and merge if someone else uploaded since our last sync.
+    remote = fetchRemoteMeta(self._service, self.file_id)
+    if remote.get('md5Checksum') != self.dataset.meta.get('md5Checksum'):
+      self.dataset.refresh(remote)
+    from googleapiclient.http import MediaFileUpload
+    with metrics.span('drive.export'):
+      count = self.dataset.exportSnapshot()
+    media = MediaFileUpload(self.dataset.path, mimetype='application/csv', resumable=True)
+    request = self._service.files().update(fileId=self.file_id, media_body=media, body={'mimeType': 'application/csv'}, fields=META_FIELDS)
+    with metrics.span('drive.upload'):
+      response = request.execute()
+    metrics.count('drive_uploads')
+    with self.dataset.lock:
+      self.dataset.markUploaded(response, count)
+      self.pending = max(0, self.pending - count)
+      self.last_synced = datetime.now()
+    return response
+
+@st.cache_resource
+def getSyncWorker():
+  return DriveSyncWorker(getDataset(), buildDriveService, st.secrets['JOB_DATA'])
+
+def showSyncStatus(worker):
+  st.sidebar.divider()
+  st.sidebar.caption("Drive Sync")
+  if worker.last_error is not None:
+    st.sidebar.error(f"Sync failed ({worker.failures} attempts): {worker.last_error}", icon="🚨")
+  elif worker.pending:
+    st.sidebar.warning(f"{worker.pending} edit(s) waiting to sync", icon="⏳")
+  else:
+    st.sidebar.success("All edits synced", icon="✅")
+  last_synced = worker.last_synced.strftime('%H:%M:%S') if worker.last_synced else 'Never'
+  st.sidebar.write(f"Last synced: {last_synced}")
@@ -0,0 +1,150 @@
+import numpy as np
+import os
+
+from main.dataset import DATA_FILE, Dataset, StaleEditError, namesChanged, sameValue
+from main.search import SEARCH_FIELDS
+from main.index import DatasetIndex
+from main.journal import appendChange, appendInsert, appendUpdate, applyInsert, readJournal, replayJournal
+from main.schema import STATUS_OPTIONS, STATUS_VIEW_COLUMNS, companyFrame, ensureCategories, readDataset, toRecords, writeCache
+
+def filterPositions(data, filter_status, flags, ranked=None):
+  mask = np.ones(len(data), dtype=bool)
+  if filter_status != 'All':
+    mask &= (data['status'] == filter_status).to_numpy()
+  for column in flags:
+    mask &= data[column].to_numpy()
+  if ranked is not None:
+    return ranked[mask[ranked]]
+  return np.flatnonzero(mask)
+
+class FrameDataset(Dataset):
+  def __init__(self, service_factory, file_id, **kwargs):
+    super().__init__(service_factory, file_id, **kwargs)
+    self.data = None
+    self.row_versions = None
+    self._index = None
+
+  def hasLocalCopy(self):
+    return os.path.exists(self.path)
+
+  def prepare(self, downloaded):
+    return readDataset(self.path)
+
+  def load(self, downloaded, prepared):
+    self.data = replayJournal(prepared)
+    self.row_versions = np.zeros(len(self.data), dtype=np.int64)
+    self._index = None
+
+  def getIndex(self):
+    with self.lock:
+      if self._index is None:
+        self._index = DatasetIndex(self.data)
+      return self._index
+
+  def searchFrame(self):
+    return self.data[list(SEARCH_FIELDS)]
+
+  def names(self, category):
+    index = self.getIndex()
+    if category == 'HR':
+      return index.hr_names
+    if category == 'Company':
+      return index.company_names
+    return index.all_names
+
+  def findRow(self, category, name):
+    with self.lock:
+      data = self.data
+    rows = self.getIndex().rowsFor(category, name)
+    if len(rows) == 0:
+      return None, None
+    return data.index[rows[0]], data.iloc[rows[0]]
+
+  def companies(self):
+    return self.memoized('companies', lambda: companyFrame(self.data))
+
+  def _positions(self, filters):
+    filter_status, flags, query = filters
+    def compute():
+      ranked = self.searchIndex().rank(query) if query else None
+      return filterPositions(self.data, filter_status, flags, ranked)
+    return self.memoized(('positions', filters), compute)
+
+  def statusQuery(self, filters):
+    with self.lock:
+      data, positions = self.data, self._positions(filters)
+    status_counts = data['status'].iloc[positions].value_counts().reindex(STATUS_OPTIONS, fill_value=0)
+    return len(positions), status_counts
+
+  def statusPage(self, filters, offset, limit):
+    with self.lock:
+      data, positions = self.data, self._positions(filters)
+    return data.iloc[positions[offset:offset + limit]][STATUS_VIEW_COLUMNS]
+
+  def exportSnapshot(self):
+    with self.lock:
+      data, count = self.data, len(readJournal())
+    data.to_csv(DATA_FILE + '.tmp', index=False)
+    os.replace(DATA_FILE + '.tmp', DATA_FILE)
+    writeCache(data, DATA_FILE)
+    return count
+
+  def rowVersion(self, label):
+    with self.lock:
+      return (self.generation, int(self.row_versions[self.data.index.get_loc(label)]))
+
+  def applyEdit(self, key, row, expected_version=None):
+    with self.lock:
+      label = self.getIndex().locate(*key)
+      if label is None:
+        raise StaleEditError("the contact no longer exists")
+      if expected_version is not None and self.rowVersion(label) != expected_version:
+        raise StaleEditError("the contact was changed by someone else")
+      position = self.data.index.get_loc(label)
+      # Readers keep whatever frame they were handed, so edits go into a shallow copy and only the touched columns are replaced.
+      data = self.data.copy(deep=False)
+      changed = {column: value for column, value in row.items() if not sameValue(data.at[label, column], value)}
+      ensureCategories(data, changed)
+      for column, value in changed.items():
+        values = data[column].copy()
+        values.iloc[position] = value
+        data[column] = values
+      appendChange(key, row)
+      self.data = data
+      self.row_versions[position] += 1
+      self.version += 1
+      # Rows never move, so the index only goes stale when a name it is keyed on changes.
+      if namesChanged(key, row):
+        self._index = None
+      if any(column in SEARCH_FIELDS for column in changed):
+        self._search = None
+
+  def bulkUpdate(self, filters, row):
+    with self.lock:
+      positions = self._positions(filters)
+      if len(positions) == 0:
+        return 0
+      data = self.data.copy(deep=False)
+      keys = list(zip(data['hr_name'].iloc[positions], data['company_name'].iloc[positions]))
+      ensureCategories(data, row)
+      for column, value in row.items():
+        values = data[column].copy()
+        values.iloc[positions] = value
+        data[column] = values
+      appendUpdate(keys, row)
+      self.data = data
+      self.row_versions[positions] += 1
+      self.version += 1
+      return len(positions)
+
+  def importRows(self, rows):
+    with self.lock:
+      data, inserted = applyInsert(self.data, rows)
+      if inserted:
+        appendInsert(toRecords(data.iloc[len(self.data):]))
+        self.data = data
+        self.row_versions = np.concatenate([self.row_versions, np.zeros(inserted, dtype=np.int64)])
+        self.version += 1
+        self._index = None
+        self._search = None
+      return inserted
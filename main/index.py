@@ -0,0 +1,17 @@
+class DatasetIndex:
+  def __init__(self, data):
+    self.hr_rows = data.groupby('hr_name', sort=False, observed=True).indices
+    self.company_rows = data.groupby('company_name', sort=False, observed=True).indices
+    self.hr_names = sorted(self.hr_rows)
+    self.company_names = sorted(self.company_rows)
+    self.all_names = sorted(set(self.hr_names) | set(self.company_names))
+    self.keys = {}
+    for label, key in zip(data.index, zip(data['hr_name'], data['company_name'])):
+      self.keys.setdefault(key, label)
+
+  def locate(self, hr_name, company_name):
+    return self.keys.get((hr_name, company_name))
+
+  def rowsFor(self, category, name):
+    rows = self.hr_rows if category == 'HR' else self.company_rows
+    return rows.get(name, [])
@@ -0,0 +1,105 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import time
+
+from main.schema import COLUMNS, appendRows, coerceRow, ensureCategories, freshRows, keyPositions, normalizeRows
+
+JOURNAL_FILE = 'job_data.journal'
+
+def repairTail(f):
+  # A torn write leaves a partial last line; cut it off so the next entry starts on a line of its own.
+  size = f.seek(0, os.SEEK_END)
+  if size == 0:
+    return
+  f.seek(size - 1)
+  if f.read(1) == b'\n':
+    return
+  f.seek(0)
+  f.truncate(f.read().rfind(b'\n') + 1)
+  f.seek(0, os.SEEK_END)
+
+def appendEntry(entry):
+  entry = {'ts': time.time(), **entry}
+  with open(JOURNAL_FILE, 'ab+') as f:
+    repairTail(f)
+    f.write((json.dumps(entry, default=str) + '\n').encode('utf-8'))
+    f.flush()
+    os.fsync(f.fileno())
+
+def plainValue(value):
+  # numpy scalars and pd.NA would otherwise reach the journal through default=str as "True" or "<NA>".
+  if value is None or (not isinstance(value, str) and pd.isna(value)):
+    return None
+  return value.item() if isinstance(value, np.generic) else value
+
+def plainRow(row):
+  return {column: plainValue(value) for column, value in row.items()}
+
+def appendChange(key, row):
+  appendEntry({'key': [plainValue(value) for value in key], 'row': plainRow(row)})
+
+def appendUpdate(keys, row):
+  appendEntry({'keys': [[plainValue(value) for value in key] for key in keys], 'row': plainRow(row)})
+
+def appendInsert(records):
+  appendEntry({'insert': records})
+
+def readJournal():
+  if not os.path.exists(JOURNAL_FILE):
+    return []
+  entries = []
+  with open(JOURNAL_FILE, encoding='utf-8') as f:
+    for line in f:
+      if not line.strip():
+        continue
+      try:
+        entries.append(json.loads(line))
+      except json.JSONDecodeError:
+        # Only a torn write produces a bad line, and it carries nothing recoverable; the entries around it are intact.
+        continue
+  return entries
+
+def truncateJournal(count):
+  remaining = readJournal()[count:]
+  tmp_file = JOURNAL_FILE + '.tmp'
+  with open(tmp_file, 'w', encoding='utf-8') as f:
+    for entry in remaining:
+      f.write(json.dumps(entry, default=str) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+  os.replace(tmp_file, JOURNAL_FILE)
+
+def applyChange(data, key, row):
+  # keyPositions matches missing names too, which a plain == comparison never does.
+  positions = keyPositions(data, [key])
+  if len(positions) == 0:
+    return False
+  row = coerceRow(row)
+  ensureCategories(data, row)
+  for column, value in row.items():
+    data.iloc[positions[0], data.columns.get_loc(column)] = value
+  return True
+
+def applyUpdate(data, keys, row):
+  positions = keyPositions(data, keys)
+  row = coerceRow(row)
+  ensureCategories(data, row)
+  for column, value in row.items():
+    data.iloc[positions, data.columns.get_loc(column)] = value
+  return len(positions)
+
+def applyInsert(data, rows):
+  rows = freshRows(data, rows)
+  return appendRows(data, rows), len(rows)
+
+def replayJournal(data):
+  for entry in readJournal():
+    if 'insert' in entry:
+      data = applyInsert(data, normalizeRows(pd.DataFrame.from_records(entry['insert'], columns=COLUMNS)))[0]
+    elif 'keys' in entry:
+      applyUpdate(data, entry['keys'], entry['row'])
+    else:
+      applyChange(data, entry['key'], entry['row'])
+  return data
@@ -0,0 +1,66 @@
+import streamlit as st
+import threading
+import hashlib
+import sqlite3
+import time
+
+CACHE_FILE = 'llm_cache.sqlite3'
+CACHE_TTL = 30 * 24 * 3600
+CACHE_MAX_ENTRIES = 1000
+
+def promptKey(provider, model, prompt):
+  return hashlib.sha256(f"{provider}\0{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+class ResponseCache:
+  def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.lock = threading.Lock()
+    self.conn = sqlite3.connect(path, check_same_thread=False)
+    self.conn.execute('PRAGMA journal_mode=WAL')
+    self.conn.execute('''
+      CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, provider TEXT NOT NULL, model TEXT NOT NULL, response TEXT NOT NULL,
+        created_at REAL NOT NULL, accessed_at REAL NOT NULL, pinned INTEGER NOT NULL DEFAULT 0
+      )
+    ''')
+    if 'pinned' not in [row[1] for row in self.conn.execute('PRAGMA table_info(responses)')]:
+      self.conn.execute('ALTER TABLE responses ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0')
+    self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+    self.conn.commit()
+
+  def get(self, provider, model, prompt):
+    key = promptKey(provider, model, prompt)
+    now = time.time()
+    with self.lock:
+      row = self.conn.execute('SELECT response, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+      if row is None:
+        return None
+      if now - row[1] > self.ttl:
+        self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+        self.conn.commit()
+        return None
+      self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+      self.conn.commit()
+      return row[0]
+
+  def put(self, provider, model, prompt, response, pinned=False):
+    # Pinned (pre-generated) responses only expire by age; the LRU limit applies to the ones generated on demand.
+    now = time.time()
+    with self.lock:
+      self.conn.execute(
+        'INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+        'response = excluded.response, created_at = excluded.created_at, accessed_at = excluded.accessed_at, '
+        'pinned = MAX(pinned, excluded.pinned)',
+        (promptKey(provider, model, prompt), provider, model, response, now, now, int(pinned))
+      )
+      self.conn.execute(
+        'DELETE FROM responses WHERE NOT pinned AND key NOT IN '
+        '(SELECT key FROM responses WHERE NOT pinned ORDER BY accessed_at DESC LIMIT ?)',
+        (self.max_entries,)
+      )
+      self.conn.commit()
+
+@st.cache_resource
+def getResponseCache():
+  return ResponseCache()
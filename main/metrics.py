@@ -0,0 +1,184 @@
+from collections import deque
+import streamlit as st
+import pandas as pd
+import contextlib
+import threading
+import logging
+import json
+import time
+import os
+
+RERUN_HISTORY = 50
+SAMPLE_SIZE = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = 'job_hunter'
+
+logger = logging.getLogger(__name__)
+
+def quantile(samples, q):
+  if not samples:
+    return 0.0
+  return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+def labelText(labels):
+  return ','.join(f'{key}="{value}"' for key, value in labels)
+
+class Metrics:
+  def __init__(self, history=RERUN_HISTORY, sample_size=SAMPLE_SIZE):
+    self.lock = threading.Lock()
+    self.sample_size = sample_size
+    self.counters = {}
+    self.samples = {}
+    self.totals = {}
+    self.reruns = deque(maxlen=history)
+    self._local = threading.local()
+
+  def count(self, name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with self.lock:
+      self.counters[key] = self.counters.get(key, 0) + amount
+
+  def cacheLookup(self, cache, hit):
+    self.count('cache_lookups', cache=cache)
+    if not hit:
+      self.count('cache_misses', cache=cache)
+
+  def observe(self, name, seconds):
+    with self.lock:
+      if name not in self.samples:
+        self.samples[name] = deque(maxlen=self.sample_size)
+        self.totals[name] = [0, 0.0]
+      self.samples[name].append(seconds)
+      self.totals[name][0] += 1
+      self.totals[name][1] += seconds
+
+  def annotate(self, **fields):
+    current = getattr(self._local, 'rerun', None)
+    if current is not None:
+      current.update(fields)
+
+  @contextlib.contextmanager
+  def span(self, name):
+    depth = getattr(self._local, 'depth', 0)
+    self._local.depth = depth + 1
+    start = time.perf_counter()
+    try:
+      yield
+    except Exception:
+      self.count('span_errors', span=name)
+      raise
+    finally:
+      seconds = time.perf_counter() - start
+      self._local.depth = depth
+      self.observe(name, seconds)
+      current = getattr(self._local, 'rerun', None)
+      if current is not None:
+        current['stages'].append((name, seconds, depth))
+      elif depth == 0:
+        # Background work (e.g. Drive uploads) has no rerun to attach to, so log it on its own.
+        logger.info(json.dumps({'event': 'span', 'span': name, 'seconds': round(seconds, 6)}))
+
+  @contextlib.contextmanager
+  def rerun(self):
+    # Streamlit runs each session's script on its own thread, so the rerun being recorded is thread-local.
+    current = {'started_at': time.time(), 'page': None, 'stages': []}
+    self._local.rerun = current
+    self._local.depth = 0
+    start = time.perf_counter()
+    try:
+      yield current
+    finally:
+      self._local.rerun = None
+      current['seconds'] = time.perf_counter() - start
+      self.observe('rerun', current['seconds'])
+      with self.lock:
+        self.reruns.append(current)
+      logger.info(json.dumps({
+        'event': 'rerun', 'page': current['page'], 'seconds': round(current['seconds'], 6),
+        'stages': [{'stage': name, 'seconds': round(seconds, 6), 'depth': depth} for name, seconds, depth in current['stages']]
+      }))
+
+  def recentReruns(self, limit):
+    with self.lock:
+      return list(self.reruns)[-limit:]
+
+  def spanSummary(self):
+    with self.lock:
+      samples = {name: sorted(values) for name, values in self.samples.items()}
+      totals = {name: tuple(total) for name, total in self.totals.items()}
+    return pd.DataFrame([
+      {
+        'span': name, 'count': totals[name][0],
+        'p50_ms': quantile(values, 0.5) * 1000, 'p95_ms': quantile(values, 0.95) * 1000, 'max_ms': values[-1] * 1000
+      }
+      for name, values in sorted(samples.items())
+    ], columns=['span', 'count', 'p50_ms', 'p95_ms', 'max_ms'])
+
+  def cacheSummary(self):
+    with self.lock:
+      counters = dict(self.counters)
+    rows = []
+    for (name, labels), lookups in sorted(counters.items()):
+      if name != 'cache_lookups':
+        continue
+      misses = counters.get(('cache_misses', labels), 0)
+      rows.append({'cache': dict(labels)['cache'], 'lookups': lookups, 'hit_rate': 1 - misses / lookups if lookups else 0.0})
+    return pd.DataFrame(rows, columns=['cache', 'lookups', 'hit_rate'])
+
+  def exposition(self):
+    with self.lock:
+      counters = dict(self.counters)
+      samples = {name: sorted(values) for name, values in self.samples.items()}
+      totals = {name: tuple(total) for name, total in self.totals.items()}
+
+    metric = f'{PREFIX}_span_seconds'
+    lines = [f'# HELP {metric} Duration of instrumented stages.', f'# TYPE {metric} summary']
+    for name, values in sorted(samples.items()):
+      for q in QUANTILES:
+        lines.append(f'{metric}{{span="{name}",quantile="{q}"}} {quantile(values, q):.6f}')
+      lines.append(f'{metric}_sum{{span="{name}"}} {totals[name][1]:.6f}')
+      lines.append(f'{metric}_count{{span="{name}"}} {totals[name][0]}')
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+      metric = f'{PREFIX}_{name.replace(".", "_")}_total'
+      if metric not in seen:
+        seen.add(metric)
+        lines.append(f'# TYPE {metric} counter')
+      lines.append(f'{metric}{{{labelText(labels)}}} {value}' if labels else f'{metric} {value}')
+    return '\n'.join(lines) + '\n'
+
+  def writeExposition(self, path):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+      f.write(self.exposition())
+    os.replace(path + '.tmp', path)
+
+metrics = Metrics()
+
+def rerunFrame(reruns):
+  rows = []
+  for rerun in reruns:
+    row = {'page': rerun['page'] or '', 'total': rerun['seconds'] * 1000}
+    for name, seconds, depth in rerun['stages']:
+      if depth == 0:
+        row[name] = row.get(name, 0) + seconds * 1000
+    row['other'] = row['total'] - sum(value for key, value in row.items() if key not in ('page', 'total'))
+    rows.append(row)
+  return pd.DataFrame(rows).fillna(0)
+
+def showMetricsPanel():
+  st.sidebar.divider()
+  if not st.sidebar.checkbox("Show performance metrics"):
+    return
+  limit = st.sidebar.slider("Reruns to show", min_value=1, max_value=RERUN_HISTORY, value=10)
+  reruns = metrics.recentReruns(limit)
+  if reruns:
+    frame = rerunFrame(reruns)
+    st.sidebar.caption("Last reruns by stage (ms)")
+    st.sidebar.bar_chart(frame.drop(columns=['page', 'total']))
+    st.sidebar.dataframe(frame)
+  st.sidebar.caption("Stage latency")
+  st.sidebar.dataframe(metrics.spanSummary(), hide_index=True)
+  st.sidebar.caption("Cache hit rates")
+  st.sidebar.dataframe(metrics.cacheSummary(), hide_index=True)
+  st.sidebar.download_button("Download metrics", metrics.exposition(), file_name='job_hunter_metrics.prom', mime='text/plain')
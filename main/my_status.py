@@ -1,62 +1,113 @@
 import streamlit as st
+import numpy as np
 
-def my_status(data):
-  st.subheader("My Status")
-  data_display = data[['hr_name', 'company_name', 'status', 'job_status', 'linkedin_status', 'twitter_status', 'facebook_status']].copy()
-  
-  data_display['job_status'] = data_display['job_status'].apply(lambda x: 'Applied' if x else 'Not Applied')
-  data_display['linkedin_status'] = data_display['linkedin_status'].apply(lambda x: 'Reached Out' if x else 'Not Reached Out')
-  data_display['twitter_status'] = data_display['twitter_status'].apply(lambda x: 'Reached Out' if x else 'Not Reached Out')
-  data_display['facebook_status'] = data_display['facebook_status'].apply(lambda x: 'Reached Out' if x else 'Not Reached Out')
-  
-  status_color_map = {
-    'No Openings': '🔴 No Openings',
-    'Invitation Sent': '🟡 Invitation Sent',
-    'In Talks': '🟢 In Talks'
-  }
-  data_display['status'] = data_display['status'].map(status_color_map)
+from main.drive_sync import getSyncWorker
+from main.metrics import metrics
+from main.schema import STATUS_OPTIONS, readImport
+
+FLAG_FILTERS = {
+  'job_status': "Filter by Job Status",
+  'linkedin_status': "Filter by LinkedIn Status",
+  'twitter_status': "Filter by Twitter Status",
+  'facebook_status': "Filter by Facebook Status"
+}
+FLAG_VALUES = {
+  'job_status': ('Applied', 'Not Applied'),
+  'linkedin_status': ('Reached Out', 'Not Reached Out'),
+  'twitter_status': ('Reached Out', 'Not Reached Out'),
+  'facebook_status': ('Reached Out', 'Not Reached Out')
+}
+KEEP = "Keep as is"
+QUERY_CACHE_SIZE = 32
+status_color_map = {
+  'No Openings': '🔴 No Openings',
+  'Invitation Sent': '🟡 Invitation Sent',
+  'In Talks': '🟢 In Talks'
+}
+
+@st.cache_resource(max_entries=QUERY_CACHE_SIZE)
+def queryStatus(_dataset, version, filters):
+  metrics.count('cache_misses', cache='status_query')
+  return _dataset.statusQuery(filters)
+
+def labelPage(page):
+  page = page.copy()
+  page['status'] = page['status'].astype(object).map(lambda status: status_color_map.get(status, status))
+  for column, (yes, no) in FLAG_VALUES.items():
+    page[column] = np.where(page[column], yes, no)
+  return page
 
+def bulkUpdate(dataset, filters, total_items):
+  with st.expander(f"Update all {total_items} filtered contact(s)"):
+    row = {}
+    status = st.selectbox("Set Company Status", [KEEP] + STATUS_OPTIONS)
+    if status != KEEP:
+      row['status'] = status
+    cols = st.columns(2)
+    for position, (column, (yes, no)) in enumerate(FLAG_VALUES.items()):
+      with cols[position % 2]:
+        value = st.selectbox(f"Set {FLAG_FILTERS[column].removeprefix('Filter by ')}", [KEEP, yes, no])
+      if value != KEEP:
+        row[column] = value == yes
+    if st.button("Apply to filtered contacts", disabled=not row):
+      try:
+        with metrics.span('status.bulk_update'):
+          updated = dataset.bulkUpdate(filters, row)
+      except OSError as e:
+        st.error(f"An error occurred while saving: {e}", icon="🚫")
+        return
+      getSyncWorker().notify()
+      st.toast(f"Updated {updated} contact(s).", icon="✅")
+      st.rerun()
+
+def importContacts(dataset):
+  with st.expander("Import contacts from CSV"):
+    upload = st.file_uploader("CSV with the same columns as the dataset; hr_name and company_name are required", type='csv')
+    if upload is not None and st.button("Import contacts"):
+      try:
+        rows = readImport(upload)
+        with metrics.span('status.import'):
+          inserted = dataset.importRows(rows)
+      except ValueError as e:
+        st.error(f"Could not read {upload.name}: {e}", icon="🚫")
+        return
+      except OSError as e:
+        st.error(f"An error occurred while saving: {e}", icon="🚫")
+        return
+      if inserted:
+        getSyncWorker().notify()
+      st.toast(f"Imported {inserted} contact(s), skipped {len(rows) - inserted} already present.", icon="✅")
+      st.rerun()
+
+def my_status(dataset):
+  st.subheader("My Status")
 
   cols = st.columns(2)
   with cols[0]:
-    filter_status = st.radio("Filter by Company Status", ['All', 'No Openings', 'Invitation Sent', 'In Talks'])
-    if filter_status != 'All':
-      data_display = data_display[data_display['status'] == status_color_map[filter_status]]
+    filter_status = st.radio("Filter by Company Status", ['All'] + STATUS_OPTIONS)
   with cols[1]:
-    filter_job_status = st.checkbox("Filter by Job Status")
-    if filter_job_status:
-      data_display = data_display[data_display['job_status'] == 'Applied']
-    filter_linkedin_status = st.checkbox("Filter by LinkedIn Status")
-    if filter_linkedin_status:
-      data_display = data_display[data_display['linkedin_status'] == 'Reached Out']
-    filter_twitter_status = st.checkbox("Filter by Twitter Status")
-    if filter_twitter_status:
-      data_display = data_display[data_display['twitter_status'] == 'Reached Out']
-    filter_facebook_status = st.checkbox("Filter by Facebook Status")
-    if filter_facebook_status:
-      data_display = data_display[data_display['facebook_status'] == 'Reached Out']
-
-  unique_names = sorted(data_display['hr_name'].astype(str).unique().tolist() + data_display['company_name'].astype(str).unique().tolist())
-  search_term = st.selectbox("Search for Company or HR", ["Select"] + unique_names)
-  if search_term != "Select":
-    data_display = data_display[data_display.apply(lambda row: (isinstance(row['company_name'], str) and \
-                                                                search_term in row['company_name']) or \
-                                                                  (isinstance(row['hr_name'], str) and \
-                                                                   search_term in row['hr_name']), axis=1)]
+    flags = tuple(column for column, label in FLAG_FILTERS.items() if st.checkbox(label))
+
+  search_term = st.text_input("Search contacts", placeholder="Name, company, job title, niche, location or email")
+  filters = (filter_status, flags, search_term.strip() or None)
+  metrics.count('cache_lookups', cache='status_query')
+  with metrics.span('status.query'):
+    total_items, status_counts = queryStatus(dataset, dataset.version, filters)
 
   items_per_page = st.slider("No. of Items per page", min_value=1, max_value=20, step=1, value=1)
-  total_items = len(data_display)
-  total_pages = (total_items // items_per_page) + 1
+  total_pages = -(-total_items // items_per_page)
 
-  if total_pages > 1:
-    page = st.slider("Select Page", min_value=1, max_value=total_pages, step=1, value=1)
-    start_idx = (page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
+  if total_items > 0:
+    page = 1
+    if total_pages > 1:
+      page = st.slider("Select Page", min_value=1, max_value=total_pages, step=1, value=1)
 
-    st.dataframe(data_display[['hr_name', 'company_name']].iloc[start_idx:end_idx])
+    with metrics.span('status.page'):
+      st.dataframe(labelPage(dataset.statusPage(filters, (page - 1) * items_per_page, items_per_page)))
     st.write(f"#### Summary of Status")
-    status_value_counts = data_display['status'].value_counts()
-    st.bar_chart(status_value_counts)
+    st.bar_chart(status_counts.rename(status_color_map))
+    bulkUpdate(dataset, filters, total_items)
   else:
     st.toast("No Data Found!", icon="🚨")
     st.error("No Data Found!", icon="🚨")
+  importContacts(dataset)
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import argparse
+import random
+import time
+import os
+
+from main.about_company import GEMINI_MODEL, OPENAI_MODEL, company_prompt
+from main.llm_cache import ResponseCache
+from main.storage import BACKENDS, DEFAULT_BACKEND, createDataset
+
+MAX_RETRIES = 6
+BACKOFF_BASE = 2
+BACKOFF_CAP = 120
+
+class TokenBucket:
+  def __init__(self, rate, capacity=1):
+    self.rate = rate
+    self.capacity = capacity
+    self.tokens = capacity
+    self.updated_at = time.monotonic()
+    self.lock = threading.Lock()
+
+  def acquire(self):
+    while True:
+      with self.lock:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+          self.tokens -= 1
+          return
+        wait = (1 - self.tokens) / self.rate
+      time.sleep(wait)
+
+def openAiGenerator(api_key):
+  from openai import OpenAI
+  client = OpenAI(api_key=api_key, base_url=os.environ.get('OPEN_AI_BASE_URL') or None)
+  def generate(prompt):
+    response = client.chat.completions.create(model=OPENAI_MODEL, messages=[{"role": "user", "content": prompt}])
+    return response.choices[0].message.content
+  return generate
+
+def geminiGenerator(api_key):
+  import google.generativeai as genai
+  genai.configure(api_key=api_key)
+  model = genai.GenerativeModel(GEMINI_MODEL)
+  def generate(prompt):
+    return model.generate_content(prompt).text
+  return generate
+
+PROVIDERS = {
+  'openai': (OPENAI_MODEL, 'OPEN_AI_API_KEY', openAiGenerator),
+  'gemini': (GEMINI_MODEL, 'GEMINI_API_KEY', geminiGenerator)
+}
+
+def isRateLimited(e):
+  if getattr(e, 'status_code', None) == 429 or getattr(e, 'code', None) == 429:
+    return True
+  return type(e).__name__ in ('RateLimitError', 'ResourceExhausted') or 'Rate limit' in str(e)
+
+def generateWithRetry(generate, prompt, bucket):
+  for attempt in range(MAX_RETRIES):
+    bucket.acquire()
+    try:
+      return generate(prompt)
+    except Exception as e:
+      if not isRateLimited(e) or attempt + 1 == MAX_RETRIES:
+        raise
+      delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+      time.sleep(delay + random.uniform(0, delay / 2))
+
+def pregenerate(company_data, cache, provider, generate, concurrency, rate, refresh=False):
+  model = PROVIDERS[provider][0]
+  jobs = []
+  for _, row in company_data.iterrows():
+    prompt = company_prompt(row)
+    if refresh or cache.get(provider, model, prompt) is None:
+      jobs.append((row['company_name'], prompt))
+  print(f"[{provider}] {len(company_data) - len(jobs)} already cached, {len(jobs)} to generate")
+
+  bucket = TokenBucket(rate, capacity=concurrency)
+  done, failed = 0, 0
+  with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=provider) as executor:
+    futures = {executor.submit(generateWithRetry, generate, prompt, bucket): (company, prompt) for company, prompt in jobs}
+    for future in as_completed(futures):
+      company, prompt = futures[future]
+      try:
+        response = future.result()
+      except Exception as e:
+        failed += 1
+        print(f"[{provider}] {company}: failed ({e})")
+        continue
+      if response:
+        cache.put(provider, model, prompt, response, pinned=True)
+      done += 1
+      print(f"[{provider}] {company}: done ({done}/{len(jobs)})")
+  return done, failed
+
+def main():
+  parser = argparse.ArgumentParser(description="Pre-generate company overviews into the response cache.")
+  parser.add_argument('--backend', choices=list(BACKENDS), default=DEFAULT_BACKEND, help="Storage backend holding the local dataset copy.")
+  parser.add_argument('--provider', choices=list(PROVIDERS), action='append', help="Provider to warm, may be repeated (default: all with an API key set).")
+  parser.add_argument('--concurrency', type=int, default=4, help="Concurrent requests per provider.")
+  parser.add_argument('--rate', type=float, default=1.0, help="Requests per second per provider.")
+  parser.add_argument('--limit', type=int, default=None, help="Only process the first N companies.")
+  parser.add_argument('--refresh', action='store_true', help="Regenerate overviews that are already cached.")
+  args = parser.parse_args()
+
+  dataset = createDataset(args.backend, None, None)
+  dataset.openLocal()
+  company_data = dataset.companies()
+  if args.limit is not None:
+    company_data = company_data.head(args.limit)
+  cache = ResponseCache()
+
+  providers = args.provider or [name for name, (_, env_key, _) in PROVIDERS.items() if os.environ.get(env_key)]
+  if not providers:
+    parser.error("set OPEN_AI_API_KEY and/or GEMINI_API_KEY, or pass --provider")
+
+  results = {}
+  threads = []
+  for provider in providers:
+    _, env_key, factory = PROVIDERS[provider]
+    generate = factory(os.environ.get(env_key, ""))
+    thread = threading.Thread(
+      target=lambda p=provider, g=generate: results.__setitem__(p, pregenerate(company_data, cache, p, g, args.concurrency, args.rate, args.refresh))
+    )
+    thread.start()
+    threads.append(thread)
+  for thread in threads:
+    thread.join()
+
+  for provider, (done, failed) in results.items():
+    print(f"[{provider}] generated {done}, failed {failed}")
+  if any(failed for _, failed in results.values()):
+    raise SystemExit(1)
+
+if __name__ == '__main__':
+  main()
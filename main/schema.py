@@ -0,0 +1,127 @@
+import pandas as pd
+import numpy as np
+import os
+
+STATUS_OPTIONS = ['No Openings', 'Invitation Sent', 'In Talks']
+BOOL_COLUMNS = ['job_status', 'linkedin_status', 'twitter_status', 'facebook_status']
+CATEGORY_COLUMNS = ['company_niche', 'company_location']
+STRING_COLUMNS = [
+  'hr_name', 'hr_job_title', 'hr_email', 'hr_phone', 'hr_linkedin_username', 'hr_twitter_username',
+  'hr_facebook_username', 'company_name', 'company_website', 'company_email', 'company_linkedin_username',
+  'company_twitter_username', 'company_facebook_username'
+]
+COLUMNS = [
+  'hr_name', 'hr_job_title', 'hr_email', 'hr_phone', 'hr_linkedin_username', 'hr_twitter_username',
+  'hr_facebook_username', 'company_name', 'company_website', 'company_email', 'company_linkedin_username',
+  'company_twitter_username', 'company_facebook_username', 'company_location', 'company_niche', 'status',
+  'job_status', 'linkedin_status', 'twitter_status', 'facebook_status'
+]
+COMPANY_COLUMNS = [
+  'company_name', 'company_website', 'company_linkedin_username', 'company_twitter_username',
+  'company_facebook_username', 'company_location', 'company_niche'
+]
+KEY_COLUMNS = ['hr_name', 'company_name']
+NAME_COLUMNS = {'HR': 'hr_name', 'Company': 'company_name'}
+STATUS_VIEW_COLUMNS = ['hr_name', 'company_name', 'status', 'job_status', 'linkedin_status', 'twitter_status', 'facebook_status']
+TRUE_VALUES = ['true', '1', 'yes']
+
+def toBool(column):
+  if column.dtype == bool:
+    return column
+  return column.astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+def toFlag(value):
+  if isinstance(value, (bool, np.bool_)):
+    return bool(value)
+  return str(value).strip().lower() in TRUE_VALUES
+
+def coerceRow(row):
+  # Journaled rows come back from JSON, so flags are forced back to booleans before they are applied.
+  return {column: toFlag(value) if column in BOOL_COLUMNS else value for column, value in row.items()}
+
+def applySchema(data):
+  for column in STRING_COLUMNS:
+    if column in data:
+      data[column] = data[column].astype('string')
+  for column in CATEGORY_COLUMNS:
+    if column in data:
+      data[column] = data[column].astype('category')
+  if 'status' in data:
+    # Statuses outside the known options (legacy values, other spellings) are kept rather than blanked.
+    extra = sorted(set(data['status'].dropna().astype(str)) - set(STATUS_OPTIONS))
+    data['status'] = pd.Categorical(data['status'], categories=STATUS_OPTIONS + extra)
+  for column in BOOL_COLUMNS:
+    if column in data:
+      data[column] = toBool(data[column])
+  return data
+
+def normalizeRows(data):
+  missing = [column for column in KEY_COLUMNS if column not in data]
+  if missing:
+    raise ValueError(f"missing required column(s): {', '.join(missing)}")
+  data = applySchema(data.reindex(columns=COLUMNS))
+  data['status'] = data['status'].fillna(STATUS_OPTIONS[0])
+  return data[data['hr_name'].notna() | data['company_name'].notna()].reset_index(drop=True)
+
+def readImport(source):
+  return normalizeRows(pd.read_csv(source, dtype={column: 'string' for column in STRING_COLUMNS}))
+
+def rowKeys(data):
+  return pd.MultiIndex.from_arrays([data[column] for column in KEY_COLUMNS])
+
+def keyPositions(data, keys):
+  # Like the single-row lookups, a key that appears more than once resolves to its first row.
+  index = rowKeys(data)
+  first = ~index.duplicated()
+  found = index[first].get_indexer(pd.MultiIndex.from_tuples([tuple(key) for key in keys]))
+  return np.flatnonzero(first)[found[found >= 0]]
+
+def freshRows(data, rows):
+  rows = rows.drop_duplicates(subset=KEY_COLUMNS)
+  return rows[~rowKeys(rows).isin(rowKeys(data))]
+
+def appendRows(data, rows):
+  data, rows = data.copy(deep=False), rows.copy()
+  for column in CATEGORY_COLUMNS + ['status']:
+    known = data[column].cat.categories
+    categories = known.append(rows[column].cat.categories.difference(known))
+    data[column] = data[column].cat.set_categories(categories)
+    rows[column] = rows[column].cat.set_categories(categories)
+  return pd.concat([data, rows], ignore_index=True)
+
+def toRecords(data):
+  return data.astype(object).where(data.notna(), None).to_dict('records')
+
+def companyFrame(data):
+  data = data[data['company_name'].notnull()]
+  data = data.drop_duplicates(subset='company_name')
+  return data[COMPANY_COLUMNS]
+
+def ensureCategories(data, row):
+  for column, value in row.items():
+    if column not in data or not isinstance(data[column].dtype, pd.CategoricalDtype) or pd.isna(value):
+      continue
+    if value not in data[column].cat.categories:
+      data[column] = data[column].cat.add_categories([value])
+
+def cachePath(csv_path):
+  return os.path.splitext(csv_path)[0] + '.feather'
+
+def writeCache(data, csv_path):
+  path = cachePath(csv_path)
+  # Uncompressed so the file can be memory-mapped on the next load.
+  data.reset_index(drop=True).to_feather(path + '.tmp', compression='uncompressed')
+  os.replace(path + '.tmp', path)
+
+def readDataset(csv_path):
+  path = cachePath(csv_path)
+  if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+    import pyarrow.feather as feather
+    data = feather.read_table(path, memory_map=True).to_pandas()
+    # Dictionary-encoded columns come back as read-only views over the mapped file, and rows get edited in place.
+    for column in CATEGORY_COLUMNS + ['status']:
+      data[column] = data[column].copy()
+    return data
+  data = applySchema(pd.read_csv(csv_path, dtype={column: 'string' for column in STRING_COLUMNS}))
+  writeCache(data, csv_path)
+  return data
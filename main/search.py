@@ -0,0 +1,111 @@
+from collections import Counter
+import pandas as pd
+import numpy as np
+import re
+
+SEARCH_FIELDS = {
+  'hr_name': 3.0,
+  'company_name': 3.0,
+  'hr_job_title': 1.5,
+  'company_niche': 1.0,
+  'company_location': 1.0,
+  'hr_email': 0.5
+}
+SEARCH_LIMIT = 50
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+FUZZY_THRESHOLD = 0.4
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+def tokenize(text):
+  if text is None or (not isinstance(text, str) and pd.isna(text)):
+    return []
+  return TOKEN_PATTERN.findall(str(text).lower())
+
+def trigrams(token):
+  padded = f'  {token} '
+  return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+  def __init__(self, data):
+    self.size = len(data)
+    self.labels = data.index.to_numpy()
+    self.columns = {}
+    self.fields = []
+    entries = []
+    for field, (column, weight) in enumerate(SEARCH_FIELDS.items()):
+      # Tokenize each distinct value once; rows only carry a code into the field's value table.
+      codes, values = pd.factorize(data[column])
+      self.columns[column] = data[column].to_numpy(dtype=object)
+      self.fields.append((weight, codes, len(values)))
+      tokens = pd.Series(np.asarray(values, dtype=object)).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+      entries.append(pd.DataFrame({'token': tokens.to_numpy(dtype=object), 'field': field, 'value': tokens.index.to_numpy()}))
+    entries = pd.concat(entries, ignore_index=True).drop_duplicates()
+    # Postings are stored CSR-style: the entries for vocabulary[i] sit between offsets[i] and offsets[i + 1].
+    codes, vocabulary = pd.factorize(entries['token'], sort=True)
+    order = np.argsort(codes, kind='stable')
+    self.vocabulary = np.asarray(vocabulary, dtype=object)
+    self.posting_fields = entries['field'].to_numpy()[order]
+    self.posting_values = entries['value'].to_numpy()[order]
+    self.offsets = np.searchsorted(codes[order], np.arange(len(vocabulary) + 1))
+    self._trigrams = None
+
+  def _gramIndex(self):
+    # Fuzzy matching is only the fallback for tokens with no exact or prefix hit, so build this on first use.
+    if self._trigrams is None:
+      index = {}
+      for position, token in enumerate(self.vocabulary):
+        # Ids, phone numbers and email handles are never misspelled on purpose, so only words get fuzzy matching.
+        if not token.isalpha():
+          continue
+        for gram in trigrams(token):
+          index.setdefault(gram, []).append(position)
+      self._trigrams = index
+    return self._trigrams
+
+  def _matchTokens(self, token):
+    start = np.searchsorted(self.vocabulary, token, side='left')
+    stop = np.searchsorted(self.vocabulary, token + '\uffff', side='left')
+    positions = np.arange(start, stop)
+    scores = np.where(self.vocabulary[positions] == token, 1.0, PREFIX_SCORE)
+    if len(positions) == 0 and len(token) >= 3:
+      grams = trigrams(token)
+      shared = Counter(position for gram in grams for position in self._gramIndex().get(gram, ()))
+      similar = {
+        position: 2 * count / (len(grams) + len(self.vocabulary[position]) + 1) for position, count in shared.items()
+      }
+      similar = {position: similarity for position, similarity in similar.items() if similarity >= FUZZY_THRESHOLD}
+      positions = np.fromiter(similar, dtype=np.int64, count=len(similar))
+      scores = FUZZY_SCORE * np.fromiter(similar.values(), dtype=float, count=len(similar))
+    return positions, scores
+
+  def _scoreToken(self, token):
+    positions, scores = self._matchTokens(token)
+    starts, lengths = self.offsets[positions], self.offsets[positions + 1] - self.offsets[positions]
+    entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    fields, values, scores = self.posting_fields[entries], self.posting_values[entries], np.repeat(scores, lengths)
+    row_scores = np.zeros(self.size)
+    for field, (weight, codes, count) in enumerate(self.fields):
+      value_scores = np.zeros(count + 1)
+      matched = fields == field
+      np.maximum.at(value_scores, values[matched], scores[matched])
+      # Missing values are coded -1, which lands on the spare trailing zero.
+      np.maximum(row_scores, value_scores[codes] * weight, out=row_scores)
+    return row_scores
+
+  def rank(self, query):
+    tokens = tokenize(query)
+    if not tokens:
+      return np.arange(self.size)
+    total = np.zeros(self.size)
+    alive = np.ones(self.size, dtype=bool)
+    for token in dict.fromkeys(tokens):
+      scores = self._scoreToken(token)
+      alive &= scores > 0
+      total += scores
+    positions = np.flatnonzero(alive)
+    return positions[np.argsort(-total[positions], kind='stable')]
+
+  def names(self, query, column, limit=SEARCH_LIMIT):
+    values = pd.unique(self.columns[column][self.rank(query)])
+    return [value for value in values[:limit + 2] if not pd.isna(value)][:limit]
@@ -0,0 +1,292 @@
+import pandas as pd
+import numpy as np
+import sqlite3
+import json
+import os
+
+from main.dataset import DATA_FILE, Dataset, StaleEditError, searchChanged
+from main.journal import appendChange, appendInsert, appendUpdate, readJournal
+from main.search import SEARCH_FIELDS
+from main.schema import (
+  BOOL_COLUMNS, COLUMNS, COMPANY_COLUMNS, KEY_COLUMNS, NAME_COLUMNS, STATUS_OPTIONS, STATUS_VIEW_COLUMNS, STRING_COLUMNS, applySchema,
+  coerceRow, normalizeRows, toRecords
+)
+
+DB_FILE = 'job_data.sqlite3'
+CHUNK_SIZE = 50000
+SCHEMA = f'''
+  CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    {', '.join(f"{column} INTEGER NOT NULL DEFAULT 0" if column in BOOL_COLUMNS else f"{column} TEXT" for column in COLUMNS)},
+    row_version INTEGER NOT NULL DEFAULT 0
+  );
+  CREATE INDEX IF NOT EXISTS contacts_hr_name ON contacts (hr_name);
+  CREATE INDEX IF NOT EXISTS contacts_company_name ON contacts (company_name);
+  CREATE INDEX IF NOT EXISTS contacts_status ON contacts (status);
+  CREATE INDEX IF NOT EXISTS contacts_key ON contacts (hr_name, company_name);
+'''
+INSERT = f"INSERT INTO contacts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+def toSql(value):
+  if value is None or (not isinstance(value, str) and pd.isna(value)):
+    return None
+  if isinstance(value, (bool, np.bool_)):
+    return int(value)
+  return value
+
+def removeDatabase(path):
+  for suffix in ('', '-wal', '-shm'):
+    if os.path.exists(path + suffix):
+      os.remove(path + suffix)
+
+def toFrame(rows, columns):
+  return applySchema(pd.DataFrame.from_records(rows, columns=columns))
+
+class SqliteDataset(Dataset):
+  def __init__(self, service_factory, file_id, db_path=DB_FILE, **kwargs):
+    super().__init__(service_factory, file_id, **kwargs)
+    self.db_path = db_path
+    self.conn = self._connect(db_path)
+
+  def _connect(self, path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+  def _count(self):
+    return self.conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
+
+  def hasLocalCopy(self):
+    with self.lock:
+      return self._count() > 0 or os.path.exists(self.path)
+
+  def prepare(self, downloaded):
+    # The database already holds every local edit, so it only needs rebuilding from a freshly downloaded CSV.
+    with self.lock:
+      if not downloaded and self._count() > 0:
+        return None
+    # The copy is built in a file of its own so readers keep the current one until load swaps it in.
+    path = self.db_path + '.next'
+    removeDatabase(path)
+    conn = self._connect(path)
+    try:
+      with conn:
+        for chunk in pd.read_csv(self.path, dtype={column: 'string' for column in STRING_COLUMNS}, chunksize=CHUNK_SIZE):
+          chunk = applySchema(chunk.reindex(columns=COLUMNS))
+          conn.executemany(INSERT, ([toSql(value) for value in row] for row in chunk.itertuples(index=False)))
+    finally:
+      conn.close()
+    return path
+
+  def load(self, downloaded, prepared):
+    if prepared is None:
+      return
+    self.conn.close()
+    removeDatabase(self.db_path)
+    os.replace(prepared, self.db_path)
+    self.conn = self._connect(self.db_path)
+    # Edits journaled while the copy was being built are only visible from here, so the journal is replayed under the lock.
+    with self.conn:
+      for entry in readJournal():
+        if 'insert' in entry:
+          self._insertFresh(normalizeRows(pd.DataFrame.from_records(entry['insert'], columns=COLUMNS)))
+          continue
+        for key in entry.get('keys', [entry.get('key')]):
+          found = self._locate(key)
+          if found is not None:
+            self._write(found[0], coerceRow(entry['row']))
+
+  def _insertFresh(self, rows):
+    rows = rows.drop_duplicates(subset=KEY_COLUMNS).reset_index(drop=True)
+    self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS staged (seq INTEGER PRIMARY KEY, hr_name TEXT, company_name TEXT)')
+    self.conn.execute('DELETE FROM staged')
+    self.conn.executemany(
+      'INSERT INTO staged VALUES (?, ?, ?)',
+      ((seq, toSql(hr_name), toSql(company_name)) for seq, hr_name, company_name in zip(rows.index, rows['hr_name'], rows['company_name']))
+    )
+    fresh = [seq for (seq,) in self.conn.execute(
+      'SELECT seq FROM staged s WHERE NOT EXISTS '
+      '(SELECT 1 FROM contacts c WHERE c.hr_name IS s.hr_name AND c.company_name IS s.company_name) ORDER BY seq'
+    )]
+    rows = rows.iloc[fresh]
+    self.conn.executemany(INSERT, ([toSql(value) for value in row] for row in rows.itertuples(index=False)))
+    return rows
+
+  def _locate(self, key):
+    return self.conn.execute(
+      'SELECT id, row_version FROM contacts WHERE hr_name IS ? AND company_name IS ? ORDER BY id LIMIT 1',
+      (toSql(key[0]), toSql(key[1]))
+    ).fetchone()
+
+  def _write(self, row_id, row):
+    columns = [column for column in row if column in COLUMNS]
+    assignments = ', '.join(f'{column} = ?' for column in columns)
+    self.conn.execute(
+      f'UPDATE contacts SET {assignments}, row_version = row_version + 1 WHERE id = ?',
+      [toSql(row[column]) for column in columns] + [row_id]
+    )
+
+  def _ranked(self, query):
+    index = self.searchIndex()
+    return index.labels[index.rank(query)]
+
+  def _where(self, filters):
+    filter_status, flags, query = filters
+    clauses, params = [], []
+    if filter_status != 'All':
+      clauses.append('status = ?')
+      params.append(filter_status)
+    for column in flags:
+      if column in BOOL_COLUMNS:
+        clauses.append(f'{column} = 1')
+    if query:
+      clauses.append('id IN (SELECT value FROM json_each(?))')
+      params.append(json.dumps(self._ranked(query).tolist()))
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+  def searchFrame(self):
+    with self.lock:
+      rows = self.conn.execute(f"SELECT id, {', '.join(SEARCH_FIELDS)} FROM contacts ORDER BY id").fetchall()
+    return pd.DataFrame.from_records(rows, columns=['id'] + list(SEARCH_FIELDS), index='id')
+
+  def names(self, category):
+    if category not in NAME_COLUMNS:
+      return self.memoized('all_names', lambda: sorted(set(self.names('HR')) | set(self.names('Company'))))
+    column = NAME_COLUMNS[category]
+    def compute():
+      rows = self.conn.execute(f'SELECT DISTINCT {column} FROM contacts WHERE {column} IS NOT NULL ORDER BY {column}')
+      return [name for (name,) in rows]
+    return self.memoized(('names', category), compute)
+
+  def findRow(self, category, name):
+    column = NAME_COLUMNS[category]
+    with self.lock:
+      row = self.conn.execute(f"SELECT id, {', '.join(COLUMNS)} FROM contacts WHERE {column} = ? ORDER BY id LIMIT 1", (name,)).fetchone()
+    if row is None:
+      return None, None
+    return row[0], toFrame([row[1:]], COLUMNS).iloc[0]
+
+  def companies(self):
+    def compute():
+      # SQLite takes the bare columns from the row that supplied MIN(id), i.e. the first contact of each company.
+      rows = self.conn.execute(
+        f"SELECT MIN(id), {', '.join(COMPANY_COLUMNS)} FROM contacts WHERE company_name IS NOT NULL GROUP BY company_name ORDER BY MIN(id)"
+      ).fetchall()
+      return toFrame([row[1:] for row in rows], COMPANY_COLUMNS)
+    return self.memoized('companies', compute)
+
+  def statusQuery(self, filters):
+    where, params = self._where(filters)
+    with self.lock:
+      rows = self.conn.execute(f'SELECT status, COUNT(*) FROM contacts{where} GROUP BY status', params).fetchall()
+    total = sum(count for _, count in rows)
+    status_counts = pd.Series(dict(rows), dtype='int64').reindex(STATUS_OPTIONS, fill_value=0).rename('count')
+    return total, status_counts
+
+  def _matches(self, filters):
+    # Search results page in relevance order, which SQL can't sort by, so keep the ranked ids that pass the filters.
+    def compute():
+      where, params = self._where(filters)
+      with self.lock:
+        matching = {row_id for (row_id,) in self.conn.execute(f'SELECT id FROM contacts{where}', params)}
+      return [row_id for row_id in self._ranked(filters[2]).tolist() if row_id in matching]
+    return self.memoized(('matches', filters), compute)
+
+  def statusPage(self, filters, offset, limit):
+    columns = ', '.join(STATUS_VIEW_COLUMNS)
+    if filters[2]:
+      ids = self._matches(filters)[offset:offset + limit]
+      with self.lock:
+        found = {row[0]: row for row in self.conn.execute(f"SELECT id, {columns} FROM contacts WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),))}
+      rows = [found[row_id] for row_id in ids if row_id in found]
+    else:
+      where, params = self._where(filters)
+      with self.lock:
+        rows = self.conn.execute(f"SELECT id, {columns} FROM contacts{where} ORDER BY id LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+    page = toFrame([row[1:] for row in rows], STATUS_VIEW_COLUMNS)
+    page.index = [row[0] for row in rows]
+    return page
+
+  def exportSnapshot(self):
+    export = sqlite3.connect(self.db_path, isolation_level=None)
+    try:
+      with self.lock:
+        count = len(readJournal())
+        # The first fetch pins a WAL read snapshot, so edits made while the rest streams out don't leak into it.
+        export.execute('BEGIN')
+        cursor = export.execute(f"SELECT {', '.join(COLUMNS)} FROM contacts ORDER BY id")
+        rows = cursor.fetchmany(CHUNK_SIZE)
+      with open(DATA_FILE + '.tmp', 'w', encoding='utf-8', newline='') as f:
+        header = True
+        while rows:
+          chunk = pd.DataFrame.from_records(rows, columns=COLUMNS)
+          for column in BOOL_COLUMNS:
+            chunk[column] = chunk[column].astype(bool)
+          chunk.to_csv(f, header=header, index=False)
+          header = False
+          rows = cursor.fetchmany(CHUNK_SIZE)
+      export.execute('COMMIT')
+    finally:
+      export.close()
+    os.replace(DATA_FILE + '.tmp', DATA_FILE)
+    return count
+
+  def rowVersion(self, label):
+    with self.lock:
+      return (self.generation, self.conn.execute('SELECT row_version FROM contacts WHERE id = ?', (label,)).fetchone()[0])
+
+  def applyEdit(self, key, row, expected_version=None):
+    with self.lock:
+      found = self._locate(key)
+      if found is None:
+        raise StaleEditError("the contact no longer exists")
+      if expected_version is not None and (self.generation, found[1]) != expected_version:
+        raise StaleEditError("the contact was changed by someone else")
+      current = self.conn.execute(f"SELECT {', '.join(SEARCH_FIELDS)} FROM contacts WHERE id = ?", (found[0],)).fetchone()
+      try:
+        self._write(found[0], row)
+        appendChange(key, row)
+      except Exception:
+        self.conn.rollback()
+        raise
+      self.conn.commit()
+      self.version += 1
+      if searchChanged(dict(zip(SEARCH_FIELDS, current)), row):
+        self._search = None
+
+  def bulkUpdate(self, filters, row):
+    where, params = self._where(filters)
+    columns = [column for column in row if column in COLUMNS]
+    assignments = ', '.join(f'{column} = ?' for column in columns)
+    with self.lock:
+      keys = self.conn.execute(f'SELECT hr_name, company_name FROM contacts{where} ORDER BY id', params).fetchall()
+      if not keys:
+        return 0
+      try:
+        self.conn.execute(
+          f'UPDATE contacts SET {assignments}, row_version = row_version + 1{where}',
+          [toSql(row[column]) for column in columns] + params
+        )
+        appendUpdate(keys, row)
+      except Exception:
+        self.conn.rollback()
+        raise
+      self.conn.commit()
+      self.version += 1
+      return len(keys)
+
+  def importRows(self, rows):
+    with self.lock:
+      try:
+        inserted = self._insertFresh(rows)
+        if len(inserted):
+          appendInsert(toRecords(inserted))
+      except Exception:
+        self.conn.rollback()
+        raise
+      self.conn.commit()
+      if len(inserted):
+        self.version += 1
+        self._search = None
+      return len(inserted)
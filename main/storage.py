@@ -0,0 +1,15 @@
+import streamlit as st
+
+from main.drive import getDriveService
+from main.frame_dataset import FrameDataset
+from main.sqlite_dataset import SqliteDataset
+
+BACKENDS = {'frame': FrameDataset, 'sqlite': SqliteDataset}
+DEFAULT_BACKEND = 'sqlite'
+
+def createDataset(backend, service_factory, file_id):
+  return BACKENDS[backend](service_factory, file_id)
+
+@st.cache_resource
+def getDataset():
+  return createDataset(st.secrets.get('STORAGE_BACKEND', DEFAULT_BACKEND), getDriveService, st.secrets['JOB_DATA'])